@@ -98,9 +98,20 @@ The way to perform the mapping is utterly simple: it's the sorted keys of the di
 import io
 import os.path
 import bisect
+import re
 import logging
 import collections.abc
+import functools
+import itertools
 import shutil
+import threading
+import time
+import uuid
+import hashlib
+import mmap
+import struct
+import concurrent.futures
+from json import scanner as json_scanner, decoder as json_decoder, encoder as json_encoder
 try:
     import ujson as json
 except:
@@ -108,6 +119,14 @@ except:
 
 logger = logging.getLogger(__name__)
 #logger.addHandler(logging.NullHandler())
+
+CHUNK_SIZE = 4 * 1024 * 1024
+CHANGES_SUFFIX = '.changes'
+CLEAR_CHANGE = b'*\n'
+CHECKPOINT = b'# checkpoint\n'    # all the changes logged before it reached the dict
+BATCH = b'# batch '    # precedes the changes logged at once, followed by their size in bytes
+FOLLOWERS_SUFFIX = '.followers'
+COLUMNS_SUFFIX = '.columns'
     
 def parseLine(line):
     #print(line)
@@ -126,12 +145,505 @@ def parseValue(line):
     value = json.loads( right.decode('utf8') )
     return value
 
+def changesHeader(log_id, base):
+    # a unique id, so that followers notice when the log is replaced, and the position of its first byte
+    return b'# %s %020d\n' % (log_id.encode('utf8'), base)
+
+def readChangesHeader(file):
+    # older logs have no base: nothing was dropped from them
+    file.seek(0)
+    line = file.readline()
+    parts = line[2:].split()
+    return (parts[0].decode('utf8'), int(parts[1]) if len(parts) > 1 else 0, len(line))
+
+def rfindInFile(file, pattern, start, end):
+    # the offset of the last occurrence of pattern between start and end, or -1
+    while end - start >= len(pattern):
+        begin = max(start, end - CHUNK_SIZE)
+        file.seek(begin)
+        found = file.read(end - begin).rfind(pattern)
+        if found >= 0:
+            return begin + found
+        if begin == start:
+            break
+        end = begin + len(pattern) - 1
+    return -1
+
+def lastChange(file, start, end):
+    # where the last change logged before `end` begins, it may still be being written to the dict
+    complete = rfindInFile(file, b'\n', start - 1, end) + 1
+    if complete <= start:
+        return start
+    batch = rfindInFile(file, b'\n' + BATCH, start - 1, complete) + 1
+    if batch > 0:
+        file.seek(batch)
+        header = file.readline()
+        if batch + len(header) + int(header[len(BATCH):]) >= complete:
+            return batch
+    if complete < end:
+        return complete
+    last = rfindInFile(file, b'\n', start - 1, end - 1) + 1
+    file.seek(last)
+    return end if file.read(1) == b'#' else last
+
+def rawItems(path, missing=None):
+    # the (key, value) JSON bytes of all items of a dict file, read in big chunks
+    # if `missing` is a set, the keys whose blob was deleted meanwhile by another process are added to it
+    blobs = str(path) + '.blobs'
+    with io.open(path, 'rb', buffering=CHUNK_SIZE) as file:
+        for line in file:
+            if line == b'\n' or line[0] == 35:
+                continue
+            (left, sep, right) = line.partition(b'\t')
+            if right[:1] == b'@':
+                try:
+                    with io.open(os.path.join(blobs, right[1:].strip().decode('utf8')), 'rb') as blob:
+                        right = blob.read()
+                except FileNotFoundError:
+                    if missing is None:
+                        raise
+                    missing.add(left)
+                    continue
+            yield (left, right.rstrip(b'\n'))
+
+# partial reads: navigating the raw JSON of a value and decoding only the requested parts
+# small containers are stepped over by the C scanner of the standard json module, bigger ones
+# and the members or items before the requested ones by counting brackets and commas in chunks,
+# after deleting everything else with bytes.translate(), so that nothing is built
+
+scanValue = json_scanner.make_scanner(json_decoder.JSONDecoder())
+WS_RE = re.compile(rb'\s*')
+MEMBER_RE = re.compile(rb'\s*"([^"\\]*(?:\\.[^"\\]*)*)"\s*:\s*')
+SEPARATOR_RE = re.compile(rb'\s*,?\s*')
+COLON_RE = re.compile(rb'\s*:\s*')
+PATH_RE = re.compile(r'\[(-?\d+)\]|([^.\[\]]+)')
+STRING_RE = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"')
+SCALAR_RE = re.compile(rb'[^,\]}\s]*')
+# only used where no quote is escaped
+PLAIN_STRING_RE = re.compile(rb'"[^"]*"')
+TOKEN_RE = re.compile(rb'"[^"]*"|[\[\]{},]')
+PARTIAL_READ_SIZE = 4096   # smaller values are simply decoded
+SMALL_CONTAINER = 1024
+STRUCTURE_CHUNK = 8 * 1024
+NOT_STRUCTURE = bytes(c for c in range(256) if c not in b'[]{},"')
+DEPTH_CHANGE = [1 if c in b'[{' else -1 if c in b']}' else 0 for c in range(256)]
+
+@functools.lru_cache(maxsize=1024)
+def parsePath(path):
+    # "a.b[3].c" -> ('a', 'b', 3, 'c')
+    return tuple(int(index) if index else name for (index, name) in PATH_RE.findall(path))
+
+def structure(data, in_string=False):
+    # the brackets and commas of data which are not in strings, or None if a quote may be escaped
+    # once everything else is deleted, the quotes of most strings are adjacent
+    if b'\\"' in data or data.endswith(b'\\'):
+        return None
+    found = data.translate(None, NOT_STRUCTURE)
+    if in_string:
+        found = b'"' + found
+    found = found.replace(b'""', b'')
+    if b'"' in found:
+        found = PLAIN_STRING_RE.sub(b'', found)
+        if b'"' in found:   # ends in a string
+            found = found[:found.index(b'"')]
+    return found
+
+def unmatched(found):
+    # the numbers of closing and opening brackets left once the pairs are removed, innermost first
+    found = found.translate(None, b',')
+    size = None
+    while len(found) != size:
+        size = len(found)
+        found = found.replace(b'[]', b'').replace(b'{}', b'')
+    opening = found.count(b'[') + found.count(b'{')
+    return (len(found) - opening, opening)
+
+def depths(found, depth):
+    # the depth before and after each bracket or comma
+    return list(itertools.accumulate(map(DEPTH_CHANGE.__getitem__, found), initial=depth))
+
+def tokens(chunk, in_string):
+    # the strings, brackets and commas of a chunk without escaped quotes
+    return TOKEN_RE.finditer(chunk, chunk.index(b'"') + 1 if in_string else 0)
+
+def skipValue(raw, pos):
+    # the position right after the JSON value starting at pos
+    c = raw[pos]
+    if c == 34:    # "
+        return STRING_RE.match(raw, pos).end()
+    if c not in b'[{':
+        return SCALAR_RE.match(raw, pos).end()
+    window = raw[pos:pos + SMALL_CONTAINER]
+    if window.isascii():
+        try:
+            return pos + scanValue(window.decode('ascii'), 0)[1]
+        except (StopIteration, ValueError):   # longer than the window
+            pass
+    return skipContainer(raw, pos)
+
+def skipContainer(raw, pos):
+    start = pos
+    pos += 1
+    depth = 1
+    in_string = False
+    while pos < len(raw):
+        chunk = raw[pos:pos + STRUCTURE_CHUNK]
+        found = structure(chunk, in_string)
+        if found is None:
+            break
+        (closing, opening) = unmatched(found)
+        if closing >= depth:
+            for m in tokens(chunk, in_string):
+                depth += DEPTH_CHANGE[chunk[m.start()]]
+                if depth == 0:
+                    return pos + m.end()
+        depth += opening - closing
+        in_string ^= chunk.count(b'"') % 2 == 1
+        pos += len(chunk)
+    # a quote may be escaped: the C scanner is used instead
+    text = raw[start:].decode('utf8')
+    return start + len(text[:scanValue(text, 0)[1]].encode('utf8'))
+
+def readValue(raw, pos):
+    # the decoded JSON value starting at pos, and the position right after it
+    end = skipValue(raw, pos)
+    return (json.loads(raw[pos:end]), end)
+
+def memberName(m):
+    name = m.group(1)
+    if b'\\' in name:
+        return json.loads(b'"' + name + b'"')
+    return name.decode('utf8')
+
+def memberStart(raw, pos, name):
+    # where the value of the member of the object starting at pos begins
+    if raw[pos:pos + 1] != b'{':
+        raise TypeError(f"Not an object at {name!r}")
+    key = json.dumps(name, ensure_ascii=False).encode('utf8')
+    if key.isascii() and b'\\' not in key and b'/' not in key:
+        # the name can't be written differently: its occurrences are checked to be members of the object
+        scanned = pos + 1
+        depth = 1
+        in_string = False
+        found = raw.find(key, scanned)
+        while found >= 0:
+            between = raw[scanned:found]
+            brackets = structure(between, in_string)
+            if brackets is None:
+                break
+            (closing, opening) = unmatched(brackets)
+            if closing >= depth:   # past the end of the object
+                raise KeyError(name)
+            depth += opening - closing
+            in_string ^= between.count(b'"') % 2 == 1
+            scanned = found
+            if depth == 1 and not in_string:
+                m = COLON_RE.match(raw, found + len(key))
+                if m:
+                    return m.end()
+            found = raw.find(key, found + 1)
+        else:
+            raise KeyError(name)
+    
+    pos += 1
+    while True:
+        m = MEMBER_RE.match(raw, pos)
+        if m is None:   # end of the object
+            raise KeyError(name)
+        pos = m.end()
+        if memberName(m) == name:
+            return pos
+        pos = SEPARATOR_RE.match(raw, skipValue(raw, pos)).end()
+
+def itemStart(raw, pos, index):
+    # where the item of the list starting at pos begins, the items before are found by counting
+    # the commas outside of strings and nested containers, chunk by chunk
+    if raw[pos:pos + 1] != b'[':
+        raise TypeError(f"Not a list at {index!r}")
+    first = WS_RE.match(raw, pos + 1).end()
+    if raw[first:first + 1] == b']':
+        raise IndexError(index)
+    if index == 0:
+        return first
+    
+    chunks = []   # (position, size, depth, commas before, in string) of the chunks
+    pos += 1
+    commas = 0
+    depth = 1
+    in_string = False
+    while pos < len(raw):
+        chunk = raw[pos:pos + STRUCTURE_CHUNK]
+        found = structure(chunk, in_string)
+        if found is None:
+            return itemStartSlowly(raw, first, index)
+        levels = depths(found, depth)
+        ends = depth <= unmatched(found)[0]
+        if ends:
+            levels = levels[:levels.index(0) + 1]
+        try:
+            levels = bytes(levels)
+        except ValueError:   # nested too deep
+            return itemStartSlowly(raw, first, index)
+        # commas at depth 1 repeat the depth 1: they are the 1s which don't start a run of them
+        count = levels.count(1) - levels.count(b'\x00\x01') - levels.count(b'\x02\x01') - (levels[0] == 1)
+        chunks.append((pos, len(chunk), depth, commas, in_string))
+        if 0 < index <= commas + count:
+            return commaEnd(raw, chunks[-1], index)
+        commas += count
+        if ends:
+            break
+        depth = levels[-1]
+        in_string ^= chunk.count(b'"') % 2 == 1
+        pos += len(chunk)
+    
+    if index > 0 or commas + 1 + index < 0:
+        raise IndexError(index)
+    index += commas + 1
+    if index == 0:
+        return first
+    for chunk in reversed(chunks):
+        if chunk[3] < index:
+            return commaEnd(raw, chunk, index)
+
+def commaEnd(raw, chunk, index):
+    # where the item following the index-th comma of a list begins, given the chunk it is in
+    (pos, size, depth, commas, in_string) = chunk
+    chunk = raw[pos:pos + size]
+    for m in tokens(chunk, in_string):
+        c = chunk[m.start()]
+        if c == 44 and depth == 1:    # ,
+            commas += 1
+            if commas == index:
+                return WS_RE.match(raw, pos + m.end()).end()
+        depth += DEPTH_CHANGE[c]
+
+def itemStartSlowly(raw, pos, index):
+    starts = []
+    while raw[pos:pos + 1] != b']':
+        starts.append(pos)
+        if len(starts) > index >= 0:
+            break
+        pos = SEPARATOR_RE.match(raw, skipValue(raw, pos)).end()
+    return starts[index]
+
+def extractPath(raw, path):
+    # decodes only the value found at the given path of the raw JSON
+    if isinstance(raw, str):
+        raw = raw.encode('utf8')
+    pos = WS_RE.match(raw).end()
+    for step in parsePath(path) if isinstance(path, str) else path:
+        if isinstance(step, int):
+            pos = itemStart(raw, pos, step)
+        else:
+            pos = memberStart(raw, pos, step)
+    return readValue(raw, pos)[0]
+
+def extractFields(raw, fields):
+    # the fields found in the raw JSON, missing ones are left out
+    # all of them are collected following a tree of their steps, so that common parts are looked up once
+    tree = parseFields(tuple(fields))
+    found = {}
+    if len(raw) < PARTIAL_READ_SIZE:
+        # stepping through small values in python costs more than decoding them
+        value = json.loads(raw)
+        for field in tree[0]:
+            found[field] = value
+        pickTree(value, tree[1], found)
+    else:
+        extractTree(raw, WS_RE.match(raw).end(), tree, found)
+    return {field: found[field] for field in fields if field in found}
+
+@functools.lru_cache(maxsize=256)
+def parseFields(fields):
+    # the steps of the fields as a tree of (fields ending there, {step: subtree}):
+    # ('a.b', 'a.c[0]') -> ([], {'a': ([], {'b': (['a.b'], {}), 'c': ([], {0: (['a.c[0]'], {})})})})
+    tree = ([], {})
+    for field in fields:
+        node = tree
+        for step in parsePath(field):
+            node = node[1].setdefault(step, ([], {}))
+        node[0].append(field)
+    return tree
+
+def extractTree(raw, pos, tree, found):
+    (ending, children) = tree
+    if ending:
+        value = readValue(raw, pos)[0]
+        for field in ending:
+            found[field] = value
+        pickTree(value, children, found)
+        return
+    for (step, subtree) in children.items():
+        try:
+            start = itemStart(raw, pos, step) if isinstance(step, int) else memberStart(raw, pos, step)
+        except (KeyError, IndexError, TypeError):
+            continue
+        extractTree(raw, start, subtree, found)
+
+def pickTree(value, children, found):
+    # the same as extractTree(), on an already decoded value
+    for (step, (ending, subtree)) in children.items():
+        if isinstance(step, int) and isinstance(value, list) and -len(value) <= step < len(value):
+            item = value[step]
+        elif isinstance(step, str) and isinstance(value, dict) and step in value:
+            item = value[step]
+        else:
+            continue
+        for field in ending:
+            found[field] = item
+        pickTree(item, subtree, found)
+
+
+def scanColumns(path, start, end, fields):
+    # the keys and numeric fields of the items whose line starts in [start, end)
+    blobs = str(path) + '.blobs'
+    keys = []
+    columns = [[] for field in fields]
+    with io.open(path, 'rb', buffering=CHUNK_SIZE) as file:
+        offset = start
+        if start > 0:
+            # the line starting right before doesn't belong to this range
+            file.seek(start - 1)
+            offset = start - 1 + len(file.readline())
+        else:
+            file.seek(0)
+        for line in file:
+            if offset >= end:
+                break
+            offset += len(line)
+            if line == b'\n' or line[0] == 35:
+                continue
+            (left, sep, right) = line.partition(b'\t')
+            if right[:1] == b'@':
+                with io.open(os.path.join(blobs, right[1:].strip().decode('utf8')), 'rb') as blob:
+                    right = blob.read()
+            keys.append(json.loads(left.decode('utf8')))
+            appendNumbers(columns, fields, right)
+    return (keys, columns)
+
+def appendNumbers(columns, fields, raw):
+    # appends the numeric fields of a raw value to the columns, NaN if missing or non numeric
+    values = extractFields(raw, fields)
+    for (field, column) in zip(fields, columns):
+        value = values.get(field)
+        column.append(value if isinstance(value, (int, float)) else float('nan'))
+
+def patchColumns(keys, columns, changes):
+    # applies the changed lines to cached columns, returns the new (keys, columns)
+    import numpy
+    
+    rows = {key: row for (row, key) in enumerate(keys)}
+    keys = list(keys)
+    added = []
+    deleted = set()
+    for change in changes:
+        (left, sep, right) = change.partition(b'\t')
+        key = json.loads(left.decode('utf8'))
+        row = rows.get(key)
+        if not sep:
+            if row is not None:
+                deleted.add(row)
+                del rows[key]
+            continue
+        values = extractFields(right, list(columns))
+        values = [values.get(field) for field in columns]
+        values = [value if isinstance(value, (int, float)) else numpy.nan for value in values]
+        if row is None:
+            rows[key] = len(keys)
+            keys.append(key)
+            added.append(values)
+        elif row >= len(keys) - len(added):
+            added[row - len(keys) + len(added)] = values
+        else:
+            for (column, value) in zip(columns.values(), values):
+                column[row] = value
+    
+    if added:
+        added = numpy.array(added, dtype=float).reshape(len(added), len(columns))
+        columns = {field: numpy.concatenate([column, added[:, i]]) for (i, (field, column)) in enumerate(columns.items())}
+    if deleted:
+        keys = [key for (row, key) in enumerate(keys) if row not in deleted]
+        columns = {field: numpy.delete(column, sorted(deleted)) for (field, column) in columns.items()}
+    return (keys, columns)
+
+def scanColumnsParallel(path, fields, workers=1):
+    # the process pool is opt-in: with spawn, the calling script needs a __main__ guard,
+    # and with fork, the indexing or merging threads may be running
+    size = os.path.getsize(path)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or size < 4 * CHUNK_SIZE:
+        return scanColumns(path, 0, size, fields)
+    
+    bounds = [size * i // workers for i in range(workers + 1)]
+    keys = []
+    columns = [[] for field in fields]
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+        parts = executor.map(scanColumns, [path] * workers, bounds[:-1], bounds[1:], [fields] * workers)
+        for (part_keys, part_columns) in parts:
+            keys.extend(part_keys)
+            for (column, part) in zip(columns, part_columns):
+                column.extend(part)
+    return (keys, columns)
+
+
+# matches every non empty line, plain string and int keys are captured right away,
+# they are by far the most common ones and don't need the JSON decoder
+LINE_RE = re.compile(rb'^(?:"([^"\\\n\t]*)"\t|(-?(?:0|[1-9][0-9]*))\t|(#[^\n]*)|([^\n]+))', re.M)
+
+def scanIndex(file, offset=0, end=None, batch=100000):
+    # yields (offsets, free_lines, position) every time at least `batch` lines were read
+    # the file is read in big chunks, which is much faster than line by line
+    file.seek(offset)
+    offsets = {}
+    free_lines = []
+    rest = b''
+    while True:
+        size = CHUNK_SIZE if end is None else min(CHUNK_SIZE, end - offset - len(rest))
+        chunk = file.read(size) if size > 0 else b''
+        if chunk:
+            buf = rest + chunk
+            cut = buf.rfind(b'\n') + 1
+            if cut == 0:    # not even one complete line yet
+                rest = buf
+                continue
+            (buf, rest) = (buf[:cut], buf[cut:])
+        elif rest:
+            (buf, rest) = (rest, b'')   # the last line has no trailing \n
+        else:
+            break
+        
+        for m in LINE_RE.finditer(buf):
+            (string, integer, comment, other) = m.groups()
+            if string is not None:
+                offsets[string.decode('utf8')] = offset + m.start()
+            elif integer is not None:
+                offsets[int(integer)] = offset + m.start()
+            elif comment is not None:	# skip comments but add to free list
+                size = m.end() - m.start() + (m.end() < len(buf))
+                if size > 5 and offset + m.start() > 0:
+                    free_lines.append( (size, offset + m.start()) )
+            else:
+                offsets[parseKey(other)] = offset + m.start()
+        offset += len(buf)
+        
+        if len(offsets) + len(free_lines) >= batch:
+            yield (offsets, free_lines, offset)
+            offsets = {}
+            free_lines = []
+    
+    yield (offsets, free_lines, offset)
+
 
 class Dict(collections.abc.MutableMapping):
     START_FLAG = b'# FILE-DICT v1\n'
 
-    def __init__(self, path):
+    def __init__(self, path, lazy=False, blob_threshold=None, changelog=False):
         self.path = path
+        self.blob_threshold = blob_threshold   # values whose JSON is longer are stored in their own file
+        # whether all changes are also appended to a log, for backups and followers
+        # once there is a log, it is kept up to date, otherwise followers would silently miss changes
+        self.changelog = changelog or os.path.exists(str(path) + CHANGES_SUFFIX)
+        self._blobs = str(path) + '.blobs'
         
         if os.path.exists(path):
             file = io.open(path, 'r+b')
@@ -144,32 +656,147 @@ class Dict(collections.abc.MutableMapping):
         self._offsets = {}   # the (size, offset) of the lines, where size is in bytes, including the trailing \n
         self._free_lines = []
         self._observers = []
+        self._lock = threading.Lock()
+        self._indexing = False
+        self._index_error = None
+        self._stale = []    # lines of keys written while indexing, found by the scan only afterwards
+        self._changes = None
+        self._checkpointed = True
+        replay_from = self._openChanges() if self.changelog else None
+        # once columns are cached, the changes are logged too, so that they can be patched
+        self._columns = str(path) + COLUMNS_SUFFIX
+        self._column_changes = None
+        if os.path.exists(os.path.join(self._columns, 'columns.npz')):
+            self._column_changes = io.open(os.path.join(self._columns, 'changes'), 'ab')
+            self._column_limit = os.path.getsize(path)
         
-        offset = 0
-        while True:
-            line = file.readline()
-            if line == b'': # end of file
-                break
-            
-            # ignore empty lines
-            if line == b'\n':
-                offset += len(line) 
-                continue
-            
-            if line.startswith(b'#'):	# skip comments but add to free list
-                if len(line) > 5 and offset > 0:
-                    self._free_lines.append( (len(line), offset) )
-            else:
-                # let's parse the value as well to be sure the data is ok
-                key = parseKey(line)
-                self._offsets[key] = offset
-            
-            offset += len(line) 
+        if lazy and replay_from is None:
+            # the index is built in the background, lookups meanwhile are answered by scanning the rest of the file
+            self._indexing = True
+            self._indexed_upto = 0
+            self._index_end = file.seek(0, os.SEEK_END)
+            self._touched = set()   # keys written or deleted while indexing, the scan must not override them
+            self._indexer = threading.Thread(target=self._buildIndex, daemon=True)
+            self._indexer.start()
+            logger.info(f"Opening pysos dict '{self.path}' lazily")
+            return
+        
+        for (offsets, free_lines, position) in scanIndex(file):
+            self._offsets.update(offsets)
+            self._free_lines.extend(free_lines)
         
         self._free_lines.sort()
+        if replay_from is not None:
+            self._replayChanges(replay_from)
         logger.info(f"Created pysos dict '{self.path}' with {len(self)} items")
         logger.debug("free lines: " + str(len(self._free_lines)))
+    
+    def _buildIndex(self):
+        all_free_lines = []
+        try:
+            with io.open(self.path, 'rb') as file:
+                for (offsets, free_lines, position) in scanIndex(file, 0, self._index_end):
+                    with self._lock:
+                        if not self._indexing:  # closed or cleared meanwhile
+                            return
+                        for key in self._touched.intersection(offsets):
+                            offset = offsets.pop(key)
+                            if offset != self._offsets.get(key):
+                                # the file is only written by the main thread, it will free them
+                                self._stale.append((key, offset))
+                        self._offsets.update(offsets)
+                        self._indexed_upto = position
+                    all_free_lines.extend(free_lines)
+        except Exception as e:
+            logger.exception(f"Failed to index pysos dict '{self.path}'")
+            self._index_error = e
+            return
+        finally:
+            with self._lock:
+                if self._indexing:
+                    # lines freed meanwhile may have been seen by the scan too
+                    self._free_lines = sorted(set(all_free_lines + self._free_lines))
+                    self._touched = None
+                    self._indexing = False
+        logger.info(f"Indexed pysos dict '{self.path}' with {len(self)} items")
+        logger.debug("free lines: " + str(len(self._free_lines)))
+    
+    def _waitIndex(self):
+        if self._indexing:
+            self._indexer.join()
+        if self._index_error:
+            raise self._index_error
+        if self._stale:
+            # otherwise scanning the file would find both lines of these keys
+            with self._lock:
+                self._freeStale()
+    
+    def _stopIndex(self):
+        if self._indexing:
+            with self._lock:
+                self._indexing = False
+            self._indexer.join()
+    
+    def _scanFor(self, key):
+        # look for the key in the part of the file which was not indexed yet
+        needle = b'\n' + json.dumps(key, ensure_ascii=False).encode('utf8') + b'\t'
+        start = self._indexed_upto
+        end = self._index_end
+        with io.open(self.path, 'rb') as file:
+            if start > 0:
+                file.seek(start - 1)
+                base = start - 1
+                buf = b''
+            else:
+                base = -1
+                buf = b'\n'
+            while base + len(buf) < end:
+                chunk = file.read(min(CHUNK_SIZE, end - base - len(buf)))
+                if not chunk:
+                    break
+                buf += chunk
+                found = buf.find(needle)
+                if found >= 0:
+                    return base + found + 1
+                tail = len(needle) - 1
+                base += len(buf) - tail
+                buf = buf[-tail:]
+        return None
+    
+    def _offset(self, key, wait=True):
+        try:
+            return self._offsets[key]
+        except KeyError:
+            if not self._indexing:
+                raise
+        
+        offset = self._scanFor(key)
+        if offset is None:
+            with self._lock:
+                # it may have been indexed while scanning
+                if key in self._offsets:
+                    return self._offsets[key]
+            if not wait:
+                raise KeyError(key)
+            # maybe it's encoded differently, let's wait for the whole index to be sure
+            self._waitIndex()
+            return self._offsets[key]
         
+        with self._lock:
+            if self._indexing and key not in self._touched:
+                offset = self._offsets.setdefault(key, offset)
+        return offset
+        
+    def _freeStale(self):
+        while self._stale:
+            (key, offset) = self._stale.pop()
+            self._file.seek(offset)
+            line = self._file.readline()
+            if not line.endswith(b'\n'):   # past the end, the file was cleared meanwhile
+                continue
+            if line[:1] != b'#' and parseKey(line) == key and self._offsets.get(key) != offset:
+                self._freeLine(offset)
+    
     def _freeLine(self, offset):
         self._file.seek(offset)
         self._file.write(b'#')
@@ -181,35 +808,214 @@ class Dict(collections.abc.MutableMapping):
         if size > 5:
             bisect.insort(self._free_lines, (len(line)+1, offset) )
         
+        (left, sep, right) = line.partition(b'\t')
+        if right[:1] == b'@':
+            os.remove(self._blobPath(right))
+    
+    def _blobPath(self, ref):
+        return os.path.join(self._blobs, ref[1:].strip().decode('utf8'))
+    
+    def _writeBlob(self, data):
+        os.makedirs(self._blobs, exist_ok=True)
+        name = uuid.uuid4().hex
+        with io.open(os.path.join(self._blobs, name), 'wb') as file:
+            file.write(data)
+        return '@' + name
+    
+    def _loadValue(self, raw):
+        # the raw JSON of a value, or a reference to the blob file containing it
+        if raw[:1] == b'@':
+            with io.open(self._blobPath(raw), 'rb') as file:
+                raw = file.read()
+        return json.loads(raw.decode('utf8'))
+        
     def _findLine(self, size):
+        if self._indexing:
+            # free lines are only known once the whole file has been scanned
+            return None
         index = bisect.bisect( self._free_lines, (size,0) )
         if index >= len( self._free_lines ):
             return None
         else:
             return self._free_lines.pop(index)
         
-    def __getitem__(self, key):
-        offset = self._offsets[key]
+    def _readLine(self, key, wait=True):
+        offset = self._offset(key, wait)
         self._file.seek(offset)
-        line = self._file.readline()
-        value = parseValue(line)
+        return self._file.readline()
+
+    def __getitem__(self, key):
+        line = self._readLine(key)
+        (left, sep, right) = line.partition(b'\t')
+        value = self._loadValue(right)
         return value
+    
+    def get_path(self, key, path):
+        # only the part of the value at the given path, like "a.b[3].c", is decoded
+        return extractPath(self._rawValue(key), path)
+    
+    def get_many(self, keys, fields=None, default=None):
+        values = []
+        for key in keys:
+            try:
+                raw = self._rawValue(key)
+            except KeyError:
+                values.append(default)
+                continue
+            if fields is None:
+                values.append(json.loads(raw.decode('utf8')))
+            else:
+                values.append(extractFields(raw, fields))
+        return values
+    
+    def open_value(self, key):
+        # a binary file-like object streaming the JSON of the value
+        line = self._readLine(key)
+        (left, sep, right) = line.partition(b'\t')
+        if right[:1] == b'@':
+            return io.open(self._blobPath(right), 'rb')
+        return io.BytesIO(right.rstrip(b'\n'))
 
     def __setitem__(self, key, value):
-        self._trigger_observers(key, value, self.get(key))
+        if self._observers:
+            # while the index is being built, the old line is looked for as pysos writes the key,
+            # without waiting for the whole index
+            try:
+                old_value = self._loadValue(self._readLine(key, wait=False).partition(b'\t')[2])
+            except KeyError:
+                old_value = None
+            self._trigger_observers(key, value, old_value)
+        
+        data = json.dumps(value,ensure_ascii=False)
+        line = json.dumps(key,ensure_ascii=False) + '\t' + data + '\n'
+        line = line.encode('UTF-8')
+        change = line
+        if self.blob_threshold is not None and len(data) > self.blob_threshold:
+            # the blob is complete before the line referencing it is written
+            line = (json.dumps(key,ensure_ascii=False) + '\t' + self._writeBlob(data.encode('UTF-8')) + '\n').encode('UTF-8')
         
+        with self._lock:
+            # a key not indexed yet is appended, so that it comes after its previous line,
+            # which is freed once the indexer finds it
+            append = self._indexing and key not in self._offsets
+            if self._indexing:
+                self._touched.add(key)
+            self._logChange(change)
+            self._writeLine(key, line, append)
+    
+    def _logChange(self, change, batch=False):
+        # changes are logged before being written, a crash in between is repaired by replaying them
+        if self._changes:
+            if batch:
+                self._changes.write(BATCH + b'%d\n' % len(change))
+            self._changes.write(change)
+            self._changes.flush()
+            self._checkpointed = False
+        if self._column_changes:
+            self._column_changes.write(change)
+            self._column_changes.flush()
+            if self._column_changes.tell() > self._column_limit:
+                self._column_limit = os.fstat(self._file.fileno()).st_size
+                if self._column_changes.tell() > self._column_limit:
+                    # patching would cost more than scanning the file again
+                    self._dropColumns()
+    
+    def _checkpoint(self):
+        if self._changes and not self._checkpointed:
+            self._changes.write(CHECKPOINT)
+            self._changes.flush()
+            self._checkpointed = True
+    
+    def _openChanges(self):
+        # returns where to replay the log from, if the last changes may not have reached the dict
+        changes_path = str(self.path) + CHANGES_SUFFIX
+        if not os.path.exists(changes_path) or os.path.getsize(changes_path) == 0:
+            self._changes = io.open(changes_path, 'wb')
+            self._changes.write(changesHeader(uuid.uuid4().hex, 0))
+            self._changes.flush()
+            return None
+        
+        with io.open(changes_path, 'r+b') as file:
+            (log_id, base, start) = readChangesHeader(file)
+            end = file.seek(0, os.SEEK_END)
+            # a change torn by a crash while being logged was not written either
+            last = rfindInFile(file, b'\n', start - 1, end) + 1
+            if last < end:
+                file.truncate(last)
+                end = last
+            file.seek(max(start - 1, end - len(CHECKPOINT) - 1))
+            if end == start or file.read() == b'\n' + CHECKPOINT:
+                replay_from = None
+            else:
+                checkpoint = rfindInFile(file, b'\n' + CHECKPOINT, start - 1, end)
+                replay_from = checkpoint + 1 + len(CHECKPOINT) if checkpoint >= 0 else start
+        self._changes = io.open(changes_path, 'ab')
+        return replay_from
+    
+    def _replayChanges(self, position):
+        # the changes are idempotent, those which already reached the dict are simply written again
+        logger.info(f"Replaying the changes of pysos dict '{self.path}' after a crash")
+        with io.open(str(self.path) + CHANGES_SUFFIX, 'rb', buffering=CHUNK_SIZE) as file:
+            file.seek(position)
+            for line in file:
+                if line == CLEAR_CHANGE:
+                    self._clear()
+                    continue
+                if line[0] == 35:
+                    continue
+                (left, sep, right) = line.partition(b'\t')
+                key = json.loads(left.decode('utf8'))
+                if sep:
+                    if self.blob_threshold is not None and len(right) - 1 > self.blob_threshold:
+                        line = left + b'\t' + self._writeBlob(right[:-1]).encode('utf8') + b'\n'
+                    self._writeLine(key, line)
+                elif key in self._offsets:
+                    self._freeLine(self._offsets.pop(key))
+        self._checkpointed = False
+        self._checkpoint()
+    
+    def _rollChanges(self):
+        # drops the beginning of the log, up to the position every registered follower has reached
+        changes_path = str(self.path) + CHANGES_SUFFIX
+        with self._lock:
+            self._checkpoint()
+            with io.open(changes_path, 'rb') as file:
+                (log_id, base, start) = readChangesHeader(file)
+                end = file.seek(0, os.SEEK_END)
+            keep = end + base
+            followers = str(self.path) + FOLLOWERS_SUFFIX
+            if os.path.isdir(followers):
+                for name in os.listdir(followers):
+                    if name.endswith('.tmp'):
+                        continue
+                    with open(os.path.join(followers, name), 'rb') as file:
+                        state = json.loads(file.read().decode('utf8'))
+                    if state['log'] == log_id:
+                        keep = min(keep, state['position'])
+            header = changesHeader(log_id, 0)
+            if keep - base <= start or keep < len(header):
+                return
+            
+            logger.info(f"Dropping {keep - base - start} bytes of changes of pysos dict '{self.path}'")
+            self._changes.close()
+            with io.open(changes_path, 'rb') as src, io.open(changes_path + '.tmp', 'wb') as dest:
+                dest.write(changesHeader(log_id, keep - len(header)))
+                src.seek(keep - base)
+                shutil.copyfileobj(src, dest, CHUNK_SIZE)
+            os.replace(changes_path + '.tmp', changes_path)
+            self._changes = io.open(changes_path, 'ab')
+    
+    def _writeLine(self, key, line, append=False):
+        self._freeStale()
         if key in self._offsets:
             # to be removed once the new value has been written
             old_offset = self._offsets[key]
         else:
             old_offset = None
-            
         
-        line = json.dumps(key,ensure_ascii=False) + '\t' + json.dumps(value,ensure_ascii=False) + '\n'
-        line = line.encode('UTF-8')
         size = len(line)
         
-        found = self._findLine(size)
+        found = None if append else self._findLine(size)
 
         if found:
             # great, we can recycle a commented line
@@ -251,16 +1057,32 @@ class Dict(collections.abc.MutableMapping):
         self._offsets[key] = offset
             
     def __delitem__(self, key):
-        self._trigger_observers(key, None, self[key])
-        offset = self._offsets[key]
-        self._freeLine(offset)
-        del self._offsets[key]
+        if self._observers:
+            self._trigger_observers(key, None, self[key])
+        else:
+            # raises a KeyError if missing, and locates the line while indexing
+            self._offset(key)
+        with self._lock:
+            if self._indexing:
+                self._touched.add(key)
+            offset = self._offsets[key]
+            self._logChange((json.dumps(key,ensure_ascii=False) + '\n').encode('UTF-8'))
+            self._freeLine(offset)
+            del self._offsets[key]
 
     def __bool__(self):
         return bool(len(self))
 
     def __contains__(self, key):
-        return (key in self._offsets)
+        if key in self._offsets:
+            return True
+        if not self._indexing:
+            return False
+        try:
+            self._offset(key)
+            return True
+        except KeyError:
+            return False
 
     def observe(self, callback):
         self._observers.append(callback)
@@ -270,17 +1092,35 @@ class Dict(collections.abc.MutableMapping):
             callback(key, new_value, old_value)
 
     def keys(self):
+        self._waitIndex()
         return self._offsets.keys()
     
     def clear(self):
+        self._logChange(CLEAR_CHANGE)
+        self._clear()
+    
+    def _clear(self):
+        self._stopIndex()
         self._file.truncate(0)
         self._file.seek(0)
         self._file.write(self.START_FLAG)
         self._file.flush()
         self._offsets = {}
         self._free_lines = []
+        self._stale = []
+        if os.path.exists(self._blobs):
+            shutil.rmtree(self._blobs)
+        self._dropColumns()
+    
+    def _dropColumns(self):
+        if self._column_changes:
+            self._column_changes.close()
+            self._column_changes = None
+        if os.path.exists(self._columns):
+            shutil.rmtree(self._columns)
         
-    def items(self):
+    def items(self, fields=None):
+        self._waitIndex()
         offset = 0
         while True:
             # if somethig was read/written while iterating, the stream might be positioned elsewhere
@@ -295,9 +1135,92 @@ class Dict(collections.abc.MutableMapping):
             # ignore empty and commented lines
             if line == b'\n' or line[0] == 35:
                 continue
-            yield parseLine(line)
+            (left, sep, right) = line.partition(b'\t')
+            if fields is None:
+                yield ( json.loads(left.decode('utf8')), self._loadValue(right) )
+            else:
+                yield ( json.loads(left.decode('utf8')), extractFields(self._rawJson(right), fields) )
+    
+    def _rawItems(self):
+        self._waitIndex()
+        return rawItems(self.path)
+    
+    def _rawJson(self, right):
+        if right[:1] == b'@':
+            with io.open(self._blobPath(right), 'rb') as blob:
+                return blob.read()
+        return right.rstrip(b'\n')
+    
+    def _rawValue(self, key):
+        (left, sep, right) = self._readLine(key).partition(b'\t')
+        return self._rawJson(right)
+    
+    def _bulkWrite(self, items):
+        # items are (key, key JSON, value JSON) triples
+        if self._observers:
+            for (key, left, raw) in items:
+                self[key] = json.loads(raw.decode('utf8'))
+            return
+        self._waitIndex()
+        batch = []
+        changes = []
+        size = 0
+        for (key, left, raw) in items:
+            line = left + b'\t' + raw + b'\n'
+            changes.append(line)
+            if self.blob_threshold is not None and len(raw) > self.blob_threshold:
+                line = left + b'\t' + self._writeBlob(raw).encode('utf8') + b'\n'
+            batch.append((key, line))
+            size += len(line)
+            if size >= CHUNK_SIZE:
+                self._writeBatch(batch, changes)
+                batch = []
+                changes = []
+                size = 0
+        if batch:
+            self._writeBatch(batch, changes)
+    
+    def _writeBatch(self, batch, changes):
+        with self._lock:
+            self._logChange(b''.join(changes), batch=True)
+            # updates, and new keys fitting in a free line, go through _writeLine,
+            # so that the file doesn't grow with the changes
+            appended = []
+            pending = set()
+            for (key, line) in batch:
+                if key in pending:
+                    fits = False
+                else:
+                    fits = key in self._offsets or (self._free_lines and self._free_lines[-1][0] >= len(line))
+                if fits:
+                    self._writeLine(key, line)
+                else:
+                    appended.append((key, line))
+                    pending.add(key)
+            batch = appended
+            if not batch:
+                return
+            self._file.seek(0, os.SEEK_END)
+            start = self._file.tell()
+            # like single lines, they are first written as comments and then all made valid at once
+            self._file.write(b''.join(b'#' + line[1:] for (key, line) in batch))
+            self._file.flush()
+            self._file.seek(start)
+            self._file.write(b''.join(line for (key, line) in batch))
+            self._file.flush()
+            
+            offset = start
+            for (key, line) in batch:
+                if key in self._offsets:
+                    self._freeLine(self._offsets[key])
+                self._offsets[key] = offset
+                offset += len(line)
+    
+    def export(self, dest, format='ndjson', fields=None, key_column='key'):
+        exportItems(self._rawItems(), dest, format, fields=fields, key_column=key_column)
     
     def __iter__(self):
+        self._waitIndex()
         return iter(self._offsets)
     
     def values(self):
@@ -305,19 +1228,109 @@ class Dict(collections.abc.MutableMapping):
             yield item[1]
             
     def __len__(self):
+        self._waitIndex()
         return len(self._offsets)
 
     def size(self):
         self._file.size()
 
+    def to_columns(self, fields, workers=1):
+        # numeric fields of all values as numpy arrays, missing or non numeric values are NaN
+        (keys, columns) = self._toColumns(fields, workers)
+        return columns
+
+    def _toColumns(self, fields, workers):
+        import numpy
+        
+        cache_file = os.path.join(self._columns, 'columns.npz')
+        changes_file = os.path.join(self._columns, 'changes')
+        self._waitIndex()
+        with self._lock:
+            cached = {}
+            if self._column_changes:
+                try:
+                    with numpy.load(cache_file) as cache:
+                        header = json.loads(cache['header'].tobytes().decode('utf8'))
+                        keys = header['keys']
+                        cached = {field: cache['arr_%d' % i] for (i, field) in enumerate(header['fields'])}
+                except Exception:
+                    logger.exception(f"Failed to load the cached columns of pysos dict '{self.path}', scanning it again")
+                    cached = {}
+            
+            if not all(field in cached for field in fields):
+                # build the cache from scratch, in parallel
+                all_fields = list(dict.fromkeys(list(cached) + list(fields)))
+                self._file.flush()
+                (keys, columns) = scanColumnsParallel(self.path, all_fields, workers)
+                cached = {field: numpy.array(column, dtype=float) for (field, column) in zip(all_fields, columns)}
+                changes = None
+            else:
+                self._column_changes.flush()
+                with io.open(changes_file, 'rb') as file:
+                    changes = file.readlines()
+                if changes:
+                    (keys, cached) = patchColumns(keys, cached, changes)
+            
+            if changes is None or changes:
+                os.makedirs(self._columns, exist_ok=True)
+                header = json.dumps({'keys': keys, 'fields': list(cached)}, ensure_ascii=False).encode('utf8')
+                with io.open(cache_file + '.tmp', 'wb') as file:
+                    numpy.savez(file, *cached.values(), header=numpy.frombuffer(header, dtype=numpy.uint8))
+                os.replace(cache_file + '.tmp', cache_file)
+                if self._column_changes:
+                    self._column_changes.close()
+                self._column_changes = io.open(changes_file, 'wb')
+                self._column_limit = os.fstat(self._file.fileno()).st_size
+        
+        return (keys, {field: cached[field] for field in fields})
+
+    def freeze(self, path):
+        # writes an immutable and compacted copy, which can be opened with open_frozen()
+        FrozenDict.write(path, self._rawItems(), self.START_FLAG)
+
+    def backup(self, dest):
+        # the first backup copies everything, the next ones only apply the changes since the previous one
+        # opening the backup scans it, so `dest` can also be a Follower of this dict kept open between backups
+        if not self._changes:
+            raise ValueError("Backups need the change log, open the dict with changelog=True")
+        if isinstance(dest, Follower):
+            dest.poll()
+        elif self._changesSince(*Follower._readState(dest, self.path)):
+            follower = Follower(dest, self.path)
+            try:
+                follower.poll()
+            finally:
+                follower.close()
+        self._rollChanges()
+    
+    def _changesSince(self, log_id, position):
+        # whether the change log has more than comments, like checkpoints, past the given position
+        with io.open(str(self.path) + CHANGES_SUFFIX, 'rb') as file:
+            (current_id, base, start) = readChangesHeader(file)
+            if log_id != current_id or position is None or position < base + start:
+                return True
+            file.seek(position - base)
+            return any(line[0] != 35 for line in file)
+
     def close(self):
+        self._stopIndex()
+        with self._lock:
+            self._freeStale()
+        if self._changes:
+            self._checkpoint()
+            self._changes.close()
+        if self._column_changes:
+            self._column_changes.close()
         self._file.close()
         logger.info(f"Closed pysos dict '{self.path}' with {len(self)} items'")
         logger.debug("free lines: " + str(len(self._free_lines)))
 
     def vacuum(self):
+        if self._changes:
+            self._rollChanges()
         self.close()
         tmp_file = str(self.path) + ".tmp"
+        blobs = set()
         with open(self.path, "rb") as in_file:
             with open(tmp_file, "wb") as out_file:
                 out_file.write(next(in_file))  # start flag
@@ -325,15 +1338,395 @@ class Dict(collections.abc.MutableMapping):
                     if line.startswith(b"#") or line == b"\n":
                         continue
                     out_file.write(line)
+                    (left, sep, right) = line.partition(b"\t")
+                    if right[:1] == b"@":
+                        blobs.add(os.path.basename(self._blobPath(right)))
         shutil.move(tmp_file, self.path)
-        self.__init__(self.path)
+        # blobs left behind by a crash between writing them and their line
+        if os.path.exists(self._blobs):
+            for name in os.listdir(self._blobs):
+                if name not in blobs:
+                    os.remove(os.path.join(self._blobs, name))
+        self._reopen()
+
+    def _reopen(self):
+        self.__init__(self.path, blob_threshold=self.blob_threshold, changelog=self.changelog)
+
+
+class LogDict(collections.abc.MutableMapping):
+    """A dictionary stored as append-only segment files, in the directory `path`.
+
+    Segments contain the same lines as a `Dict` file, plus "tombstone" lines
+    made of a single key to mark deletions. Nothing is ever overwritten:
+    updates and deletions are appended to the active segment, which is sealed
+    once it exceeds `max_segment_size`. Sealed segments get a hint file with
+    just the keys and offsets, so that opening does not read the values.
+    Once `merge_after` segments are sealed, they are merged in a background
+    thread into a single one containing only the live items.
+    """
+    SEGMENT = '.log'
+    HINT = '.hint'
+    MERGING = '.merging'
+    MERGED = '.merged'
+
+    def __init__(self, path, max_segment_size=64*1024*1024, merge_after=8):
+        self.path = path
+        self.max_segment_size = max_segment_size
+        self.merge_after = merge_after
+        os.makedirs(path, exist_ok=True)
+        
+        self._lock = threading.RLock()
+        self._offsets = {}   # key -> (segment, offset)
+        self._readers = {}
+        self._observers = []
+        self._merger = None
+        
+        self._recoverMerge()
+        segments = self._listSegments()
+        self._sealed = segments[:-1]
+        for segment in self._sealed:
+            self._loadSegment(segment)
+        
+        self._active = segments[-1] if segments else 1
+        self._active_hint = self._scanSegment(self._active)
+        self._writer = io.open(self._filename(self._active, self.SEGMENT), 'ab')
+        self._active_size = self._writer.tell()
+        
+        logger.info(f"Created pysos log dict '{self.path}' with {len(self)} items in {len(segments)} segments")
+
+    def _filename(self, segment, suffix):
+        return os.path.join(self.path, '%09d%s' % (segment, suffix))
+
+    def _listSegments(self, suffix=SEGMENT):
+        segments = []
+        for name in os.listdir(self.path):
+            (base, ext) = os.path.splitext(name)
+            if ext == suffix and base.isdigit():
+                segments.append(int(base))
+        return sorted(segments)
+
+    def _recoverMerge(self):
+        for segment in self._listSegments(self.MERGING):
+            os.remove(self._filename(segment, self.MERGING))
+        # a finished merge replaces all segments up to its own
+        for target in self._listSegments(self.MERGED):
+            self._commitMerge(target, [s for s in self._listSegments() if s <= target])
+
+    def _commitMerge(self, target, segments):
+        for segment in segments:
+            for suffix in (self.SEGMENT, self.HINT):
+                filename = self._filename(segment, suffix)
+                if os.path.exists(filename):
+                    os.remove(filename)
+        os.replace(self._filename(target, self.MERGED), self._filename(target, self.SEGMENT))
+
+    def _loadSegment(self, segment):
+        hint = self._filename(segment, self.HINT)
+        if os.path.exists(hint):
+            with io.open(hint, 'rb') as file:
+                for line in file:
+                    (key, offset) = parseLine(line)
+                    if offset < 0:
+                        self._offsets.pop(key, None)
+                    else:
+                        self._offsets[key] = (segment, offset)
+        else:
+            self._writeHint(segment, self._scanSegment(segment))
+
+    def _scanSegment(self, segment):
+        # returns the (key, offset) hints of the segment, where deletions have a negative offset
+        hints = []
+        filename = self._filename(segment, self.SEGMENT)
+        if not os.path.exists(filename):
+            return hints
+        offset = 0
+        with io.open(filename, 'r+b') as file:
+            for line in file:
+                if not line.endswith(b'\n'):
+                    # the process died in the middle of a write
+                    logger.warning(f"Truncating incomplete line at the end of '{filename}'")
+                    file.truncate(offset)
+                    break
+                if line != b'\n' and line[0] != 35:
+                    (left, sep, right) = line.partition(b'\t')
+                    key = json.loads(left.decode('utf8'))
+                    if sep:
+                        self._offsets[key] = (segment, offset)
+                        hints.append((key, offset))
+                    else:
+                        self._offsets.pop(key, None)
+                        hints.append((key, -1))
+                offset += len(line)
+        return hints
+
+    def _writeHint(self, segment, hints):
+        filename = self._filename(segment, self.HINT)
+        with io.open(filename + '.tmp', 'wb') as file:
+            for (key, offset) in hints:
+                file.write((json.dumps(key, ensure_ascii=False) + '\t' + str(offset) + '\n').encode('utf8'))
+        os.replace(filename + '.tmp', filename)
+
+    def _reader(self, segment):
+        reader = self._readers.get(segment)
+        if reader is None:
+            reader = io.open(self._filename(segment, self.SEGMENT), 'rb')
+            self._readers[segment] = reader
+        return reader
+
+    def _readLine(self, key):
+        with self._lock:
+            (segment, offset) = self._offsets[key]
+            reader = self._reader(segment)
+            reader.seek(offset)
+            return reader.readline()
+
+    def _append(self, key, line, deleted=False, flush=True):
+        if self._active_size >= self.max_segment_size:
+            self._rotate()
+        offset = self._active_size
+        self._writer.write(line)
+        if flush:
+            self._writer.flush()
+        self._active_size += len(line)
+        self._active_hint.append((key, -1 if deleted else offset))
+        return offset
+
+    def _rotate(self):
+        self._writer.close()
+        self._writeHint(self._active, self._active_hint)
+        self._sealed.append(self._active)
+        self._active += 1
+        self._active_hint = []
+        self._writer = io.open(self._filename(self._active, self.SEGMENT), 'ab')
+        self._active_size = 0
+        if self.merge_after and len(self._sealed) >= self.merge_after:
+            self.merge()
+
+    def merge(self, wait=False):
+        with self._lock:
+            if (self._merger is None or not self._merger.is_alive()) and self._sealed:
+                self._merger = threading.Thread(target=self._merge, args=(list(self._sealed),), daemon=True)
+                self._merger.start()
+            merger = self._merger
+        if wait and merger:
+            merger.join()
+
+    def _merge(self, segments):
+        target = segments[-1]
+        merging = self._filename(target, self.MERGING)
+        with self._lock:
+            live = [(location, key) for (key, location) in self._offsets.items() if location[0] <= target]
+        live.sort(key=lambda item: item[0])
+        
+        hints = []
+        readers = {}
+        try:
+            with io.open(merging, 'wb') as out:
+                offset = 0
+                for (location, key) in live:
+                    (segment, old_offset) = location
+                    if segment not in readers:
+                        readers[segment] = io.open(self._filename(segment, self.SEGMENT), 'rb')
+                    reader = readers[segment]
+                    reader.seek(old_offset)
+                    line = reader.readline()
+                    out.write(line)
+                    hints.append((key, offset, location))
+                    offset += len(line)
+                out.flush()
+                os.fsync(out.fileno())
+        finally:
+            for reader in readers.values():
+                reader.close()
+        # from now on, the merge is committed, even if the process dies
+        os.replace(merging, self._filename(target, self.MERGED))
+        
+        with self._lock:
+            for segment in segments:
+                reader = self._readers.pop(segment, None)
+                if reader:
+                    reader.close()
+            self._commitMerge(target, segments)
+            self._writeHint(target, [(key, offset) for (key, offset, location) in hints])
+            for (key, offset, location) in hints:
+                if self._offsets.get(key) == location:
+                    self._offsets[key] = (target, offset)
+            self._sealed = [target] + [s for s in self._sealed if s > target]
+        logger.info(f"Merged {len(segments)} segments of pysos log dict '{self.path}'")
+
+    def __getitem__(self, key):
+        return parseValue(self._readLine(key))
+
+    def get_path(self, key, path):
+        # only the part of the value at the given path, like "a.b[3].c", is decoded
+        return extractPath(self._rawValue(key), path)
+
+    def get_many(self, keys, fields=None, default=None):
+        values = []
+        for key in keys:
+            try:
+                raw = self._rawValue(key)
+            except KeyError:
+                values.append(default)
+                continue
+            if fields is None:
+                values.append(json.loads(raw.decode('utf8')))
+            else:
+                values.append(extractFields(raw, fields))
+        return values
+
+    def __setitem__(self, key, value):
+        if self._observers:
+            self._trigger_observers(key, value, self.get(key))
+        line = json.dumps(key,ensure_ascii=False) + '\t' + json.dumps(value,ensure_ascii=False) + '\n'
+        line = line.encode('UTF-8')
+        with self._lock:
+            offset = self._append(key, line)
+            self._offsets[key] = (self._active, offset)
+
+    def __delitem__(self, key):
+        if self._observers:
+            self._trigger_observers(key, None, self[key])
+        with self._lock:
+            if key not in self._offsets:
+                raise KeyError(key)
+            line = (json.dumps(key,ensure_ascii=False) + '\n').encode('UTF-8')
+            self._append(key, line, deleted=True)
+            del self._offsets[key]
+
+    def __bool__(self):
+        return bool(len(self))
+
+    def __contains__(self, key):
+        return (key in self._offsets)
+
+    def observe(self, callback):
+        self._observers.append(callback)
+
+    def _trigger_observers(self, key, new_value, old_value):
+        for callback in self._observers:
+            callback(key, new_value, old_value)
+
+    def keys(self):
+        return self._offsets.keys()
+
+    def __iter__(self):
+        return iter(self._offsets)
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def items(self, fields=None):
+        # read segment by segment, in file order
+        for (key, line) in self._liveLines():
+            if fields is None:
+                yield (key, parseValue(line))
+            else:
+                (left, sep, right) = line.partition(b'\t')
+                yield (key, extractFields(right, fields))
+
+    def values(self):
+        for item in self.items():
+            yield item[1]
+
+    def _rawValue(self, key):
+        (left, sep, right) = self._readLine(key).partition(b'\t')
+        return right.rstrip(b'\n')
+
+    def _rawItems(self):
+        for (key, line) in self._liveLines():
+            (left, sep, right) = line.partition(b'\t')
+            yield (left, right.rstrip(b'\n'))
+
+    def to_columns(self, fields, workers=1):
+        # like Dict.to_columns(), without cache: the values are read again on each call
+        (keys, columns) = self._toColumns(fields, workers)
+        return columns
+
+    def _toColumns(self, fields, workers):
+        import numpy
+        
+        keys = []
+        columns = [[] for field in fields]
+        for (key, line) in self._liveLines():
+            (left, sep, right) = line.partition(b'\t')
+            keys.append(key)
+            appendNumbers(columns, fields, right.rstrip(b'\n'))
+        return (keys, {field: numpy.array(column, dtype=float) for (field, column) in zip(fields, columns)})
+
+    def _liveLines(self):
+        with self._lock:
+            live = sorted((location, key) for (key, location) in self._offsets.items())
+        for (location, key) in live:
+            try:
+                yield (key, self._readLine(key))
+            except KeyError:    # removed while iterating
+                continue
+
+    def _bulkWrite(self, items):
+        if self._observers:
+            for (key, left, raw) in items:
+                self[key] = json.loads(raw.decode('utf8'))
+            return
+        with self._lock:
+            for (key, left, raw) in items:
+                offset = self._append(key, left + b'\t' + raw + b'\n', flush=False)
+                self._offsets[key] = (self._active, offset)
+            self._writer.flush()
+
+    def export(self, dest, format='ndjson', fields=None, key_column='key'):
+        exportItems(self._rawItems(), dest, format, fields=fields, key_column=key_column)
+
+    def _waitMerge(self):
+        if self._merger:
+            self._merger.join()
+
+    def _closeFiles(self):
+        self._writer.close()
+        for reader in self._readers.values():
+            reader.close()
+        self._readers = {}
+
+    def clear(self):
+        self._waitMerge()
+        with self._lock:
+            self._closeFiles()
+            for name in os.listdir(self.path):
+                if os.path.splitext(name)[1] in (self.SEGMENT, self.HINT, self.MERGING, self.MERGED):
+                    os.remove(os.path.join(self.path, name))
+            self._offsets = {}
+            self._sealed = []
+            self._active = 1
+            self._active_hint = []
+            self._writer = io.open(self._filename(self._active, self.SEGMENT), 'ab')
+            self._active_size = 0
+
+    def size(self):
+        return sum(os.path.getsize(self._filename(segment, self.SEGMENT)) for segment in self._sealed + [self._active])
+
+    def close(self):
+        self._waitMerge()
+        self._closeFiles()
+        logger.info(f"Closed pysos log dict '{self.path}' with {len(self)} items")
+
+    def vacuum(self):
+        with self._lock:
+            if self._active_size:
+                self._rotate()
+        self.merge(wait=True)
+
+
+ENGINES = {
+    'lines': Dict,
+    'log': LogDict,
+}
 
 
 class List(collections.abc.MutableSequence):
     START_FLAG = b'# FILE-LIST v1\n'
     
-    def __init__(self, path):
-        self._dict = Dict(path)
+    def __init__(self, path, engine='lines', **options):
+        self._dict = ENGINES[engine](path, **options)
         self._indexes = sorted( self._dict.keys() )
         self._observers = []
     
@@ -343,6 +1736,9 @@ class List(collections.abc.MutableSequence):
         key = self._indexes[i]
         return self._dict[key]
 
+    def get_path(self, i, path):
+        return self._dict.get_path(self._indexes[i], path)
+
     def __setitem__(self, i, value):
         self._trigger_observers(i, value, self[i])
         key = self._indexes[i]
@@ -390,6 +1786,36 @@ class List(collections.abc.MutableSequence):
         for callback in self._observers:
             callback(index, new_value, old_value)
 
+    def to_columns(self, fields, workers=1):
+        # like Dict.to_columns(), in the order of the list
+        import numpy
+        (keys, columns) = self._dict._toColumns(fields, workers)
+        order = numpy.argsort(keys, kind='stable')
+        return {field: column[order] for (field, column) in columns.items()}
+
+    def _bulkAppend(self, raws):
+        if self._observers:
+            for raw in raws:
+                self.append(json.loads(raw.decode('utf8')))
+            return
+        keys = []
+        def items(key):
+            for raw in raws:
+                keys.append(key)
+                yield (key, str(key).encode('utf8'), raw)
+                key += 1
+        self._dict._bulkWrite(items(self._indexes[-1] + 1 if self._indexes else 0))
+        self._indexes.extend(keys)
+
+    def _rawItems(self, ordered):
+        if not ordered:
+            return self._dict._rawItems()
+        return ((str(key).encode('utf8'), self._dict._rawValue(key)) for key in self._indexes)
+
+    def export(self, dest, format='ndjson', fields=None, ordered=False):
+        # only the values are exported, except in the 'sos' format
+        exportItems(self._rawItems(ordered), dest, format, fields=fields, keys=False, start_flag=self.START_FLAG)
+
     def clear(self):
         self._dict.clear()
         self._indexes = []
@@ -401,13 +1827,601 @@ class List(collections.abc.MutableSequence):
         self._dict.close()
 
 
-def load(path):
+class Queue(collections.abc.Sized):
+    """A persistent double ended queue, stored like a `List`.
+
+    Items are kept under consecutive int keys between `head` and `tail`, so
+    appending and popping at both ends is O(1). Besides popping, consumers
+    can read batches with `get_many()` and acknowledge them with `ack()`.
+    Their position is kept in a '.cursors' dict next to the queue, and items
+    acknowledged by all consumers are removed, freeing their lines for new
+    items. Items delivered but not acknowledged before a crash are delivered
+    again. Keys are never reused once delivered, and `appendleft()` is
+    refused while there are consumers, since the new item would be behind
+    their cursors.
+    """
+
+    def __init__(self, path, engine='lines', **options):
+        self._dict = ENGINES[engine](path, **options)
+        self._cursors = Dict(str(path) + '.cursors')    # consumer -> last acknowledged key
+        self._delivered = {}    # consumer -> last delivered key
+        keys = self._dict.keys()
+        cursors = list(self._cursors.values())
+        # new items must come after every cursor, even once the queue was drained
+        self._next = max(cursors) + 1 if cursors else 0
+        self._head = min(keys) if keys else self._next
+        self._tail = max(max(keys) + 1, self._next) if keys else self._next
+
+    def __len__(self):
+        return len(self._dict)
+
+    def __iter__(self):
+        for key in range(self._head, self._tail):
+            if key in self._dict:   # there may be gaps in files written by a List
+                yield self._dict[key]
+
+    def append(self, value):
+        if self._tail < self._next:
+            # items after the tail were popped after being delivered, skip their keys
+            if self._head == self._tail:
+                self._head = self._next
+            self._tail = self._next
+        self._dict[self._tail] = value
+        self._tail += 1
+
+    def appendleft(self, value):
+        if len(self._cursors):
+            raise ValueError("appendleft is not possible while the queue has consumers")
+        self._dict[self._head - 1] = value
+        self._head -= 1
+
+    def pop(self):
+        while self._tail > self._head:
+            self._tail -= 1
+            if self._tail in self._dict:
+                return self._dict.pop(self._tail)
+        raise IndexError("pop from an empty queue")
+
+    def popleft(self):
+        while self._head < self._tail:
+            self._head += 1
+            if self._head - 1 in self._dict:
+                return self._dict.pop(self._head - 1)
+        raise IndexError("pop from an empty queue")
+
+    def get_many(self, n, consumer='default'):
+        # the next (key, value) items not delivered to this consumer yet
+        if consumer not in self._cursors:
+            self._cursors[consumer] = self._head - 1
+        key = max(self._delivered.get(consumer, self._cursors[consumer]) + 1, self._head)
+        items = []
+        while len(items) < n and key < self._tail:
+            if key in self._dict:
+                items.append((key, self._dict[key]))
+            key += 1
+        if items:
+            self._delivered[consumer] = items[-1][0]
+            self._next = max(self._next, items[-1][0] + 1)
+        return items
+
+    def ack(self, key, consumer='default'):
+        # acknowledges all items up to the given key, and removes those acknowledged by every consumer
+        # (acknowledging an older key again doesn't move the cursor back)
+        key = max(self._cursors.get(consumer, key), key)
+        self._cursors[consumer] = key
+        self._next = max(self._next, key + 1)
+        self._removeConsumed()
+
+    def _removeConsumed(self):
+        # removes the items acknowledged by every consumer
+        consumed = min(self._cursors.values())
+        while self._head <= consumed and self._head < self._tail:
+            if self._head in self._dict:
+                del self._dict[self._head]
+            self._head += 1
+
+    def consumers(self):
+        return list(self._cursors.keys())
+
+    def remove_consumer(self, consumer):
+        # the items only this consumer was holding back are removed too
+        del self._cursors[consumer]
+        self._delivered.pop(consumer, None)
+        if len(self._cursors):
+            self._removeConsumed()
+
+    def clear(self):
+        self._dict.clear()
+        self._cursors.clear()
+        self._delivered = {}
+        self._head = 0
+        self._tail = 0
+        self._next = 0
+
+    def close(self):
+        self._dict.close()
+        self._cursors.close()
+
+
+class DiskCache(collections.abc.MutableMapping):
+    """A size bounded persistent cache, built on top of a `Dict`.
+
+    Entries are evicted in least-recently-used order once `max_bytes` or
+    `max_items` is exceeded, and expire `ttl` seconds after being set.
+    Evicted entries are simply deleted from the underlying `Dict`, so their
+    lines become free lines which are recycled by later writes. Since free
+    lines are never merged, the file is vacuumed once it grows beyond twice
+    `max_bytes` (or twice the live bytes, without `max_bytes`).
+    """
+    META_SUFFIX = '.lru'
+
+    def __init__(self, path, max_bytes=None, max_items=None, ttl=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_items = max_items
+        self.ttl = ttl
+        self._dict = Dict(path)
+        self._meta = collections.OrderedDict()   # key -> (size, expires), least recently used first
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._pending = {}
+
+        self._loadMeta()
+        self.expire()
+        self._evict()
+
+    def _loadMeta(self):
+        # the recency order is only saved on close(), after a crash it is rebuilt from the records
+        meta_path = str(self.path) + self.META_SUFFIX
+        if os.path.exists(meta_path):
+            with open(meta_path, 'rb') as file:
+                for line in file:
+                    (key, size, expires) = json.loads(line.decode('utf8'))
+                    if key in self._dict:
+                        self._meta[key] = (size, expires)
+                        self._bytes += size
+            os.remove(meta_path)
+
+        for key in self._dict.keys():
+            if key not in self._meta:
+                line = self._dict._readLine(key)
+                (size, expires) = (len(line), parseValue(line)[0])
+                self._meta[key] = (size, expires)
+                self._meta.move_to_end(key, last=False)
+                self._bytes += size
+
+    def _saveMeta(self):
+        meta_path = str(self.path) + self.META_SUFFIX
+        with open(meta_path + '.tmp', 'wb') as file:
+            for key, (size, expires) in self._meta.items():
+                file.write(json.dumps([key, size, expires], ensure_ascii=False).encode('utf8') + b'\n')
+        shutil.move(meta_path + '.tmp', meta_path)
+
+    def _forget(self, key):
+        (size, expires) = self._meta.pop(key)
+        self._bytes -= size
+
+    def _evict(self):
+        while self._meta and (
+                (self.max_items is not None and len(self._meta) > self.max_items) or
+                (self.max_bytes is not None and self._bytes > self.max_bytes)):
+            key = next(iter(self._meta))
+            logger.debug(f"Evicting {key!r} from pysos cache '{self.path}'")
+            del self[key]
+
+    def _compact(self):
+        # the free lines left by evictions are fragmented, only vacuuming gives their space back
+        limit = 2 * (self._bytes if self.max_bytes is None else self.max_bytes) + len(Dict.START_FLAG)
+        if os.fstat(self._dict._file.fileno()).st_size > limit:
+            logger.debug(f"Vacuuming pysos cache '{self.path}'")
+            self._dict.vacuum()
+
+    def __getitem__(self, key):
+        with self._lock:
+            (size, expires) = self._meta[key]
+            if expires is not None and expires <= time.time():
+                del self[key]
+                raise KeyError(key)
+            value = self._dict[key][1]
+            self._meta.move_to_end(key)
+            return value
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def set(self, key, value, ttl=None):
+        if ttl is None:
+            ttl = self.ttl
+        expires = None if ttl is None else time.time() + ttl
+        record = [expires, value]
+        # the line written by the dict: key, tab, value and newline
+        size = len(json.dumps(key, ensure_ascii=False).encode('utf8')) + len(json.dumps(record, ensure_ascii=False).encode('utf8')) + 2
+
+        with self._lock:
+            self._dict[key] = record
+            if key in self._meta:
+                self._forget(key)
+            self._meta[key] = (size, expires)
+            self._bytes += size
+            self._evict()
+            self._compact()
+
+    def __delitem__(self, key):
+        with self._lock:
+            del self._dict[key]
+            self._forget(key)
+
+    def __contains__(self, key):
+        with self._lock:
+            if key not in self._meta:
+                return False
+            expires = self._meta[key][1]
+            return expires is None or expires > time.time()
+
+    def __iter__(self):
+        with self._lock:
+            self.expire()
+            return iter(list(self._meta))
+
+    def __len__(self):
+        with self._lock:
+            self.expire()
+            return len(self._meta)
+
+    def items(self):
+        # values are read one at a time under the lock, other threads may write meanwhile
+        with self._lock:
+            keys = list(self._meta)
+        for key in keys:
+            with self._lock:
+                if key not in self:
+                    continue
+                value = self._dict[key][1]
+            yield (key, value)
+
+    def values(self):
+        for item in self.items():
+            yield item[1]
+
+    def expire(self):
+        with self._lock:
+            now = time.time()
+            expired = [key for key, (size, expires) in self._meta.items() if expires is not None and expires <= now]
+            for key in expired:
+                del self[key]
+            return len(expired)
+
+    def get_or_compute(self, key, compute, ttl=None):
+        # concurrent misses on the same key wait for the first one to compute the value
+        while True:
+            with self._lock:
+                try:
+                    return self[key]
+                except KeyError:
+                    pass
+                pending = self._pending.get(key)
+                if pending is None:
+                    pending = threading.Event()
+                    self._pending[key] = pending
+                    break
+            pending.wait()
+
+        try:
+            value = compute()
+            self.set(key, value, ttl)
+            return value
+        finally:
+            with self._lock:
+                del self._pending[key]
+            pending.set()
+
+    def nbytes(self):
+        return self._bytes
+
+    def clear(self):
+        with self._lock:
+            self._dict.clear()
+            self._meta.clear()
+            self._bytes = 0
+
+    def vacuum(self):
+        with self._lock:
+            self._dict.vacuum()
+
+    def close(self):
+        with self._lock:
+            self._saveMeta()
+            self._dict.close()
+
+
+class Follower(Dict):
+    """A replica of a `Dict` opened with `changelog=True`, possibly written by another process.
+
+    The first `poll()` copies all items of the source, the next ones only apply
+    the changes appended to its change log since then, in batches. The position
+    in the change log is kept in a '.follow' file next to the replica.
+    """
+    STATE_SUFFIX = '.follow'
+
+    def __init__(self, path, source, batch=10000, **options):
+        Dict.__init__(self, path, **options)
+        self.source = source
+        self.batch = batch
+        (self._log_id, self._position) = self._readState(path, source)
+
+    @classmethod
+    def _readState(cls, path, source):
+        # the (log id, position) reached in the change log of the source, both None if unknown
+        state_path = str(path) + cls.STATE_SUFFIX
+        if os.path.exists(state_path):
+            with open(state_path, 'rb') as file:
+                state = json.loads(file.read().decode('utf8'))
+            if state['source'] == os.path.abspath(source):
+                return (state['log'], state['position'])
+        return (None, None)
+
+    def _reopen(self):
+        self.__init__(self.path, self.source, self.batch, blob_threshold=self.blob_threshold, changelog=self.changelog)
+
+    def _savePosition(self, position):
+        self._position = position
+        state = {'source': os.path.abspath(self.source), 'log': self._log_id, 'position': position}
+        # the source only drops the changes which all its registered followers applied
+        registry = str(self.source) + FOLLOWERS_SUFFIX
+        os.makedirs(registry, exist_ok=True)
+        name = hashlib.blake2b(os.path.abspath(self.path).encode('utf8'), digest_size=8).hexdigest()
+        for state_path in (str(self.path) + self.STATE_SUFFIX, os.path.join(registry, name)):
+            with open(state_path + '.tmp', 'wb') as file:
+                file.write(json.dumps(state).encode('utf8'))
+            shutil.move(state_path + '.tmp', state_path)
+
+    def _copyBase(self, position):
+        # changes made while copying are applied afterwards, which makes the copy consistent again
+        self.clear()
+        missing = set()
+        self._bulkWrite((json.loads(left.decode('utf8')), left, raw) for (left, raw) in rawItems(self.source, missing))
+        while missing:
+            # their blob was deleted by an update, which wrote their new line elsewhere in the file
+            keys = missing
+            missing = set()
+            self._bulkWrite((json.loads(left.decode('utf8')), left, raw) for (left, raw) in rawItems(self.source, missing) if left in keys)
+        self._savePosition(position)
+
+    def _apply(self, lines):
+        # returns the number of changes, without the comments
+        sets = []
+        comments = 0
+        for line in lines:
+            if line == CLEAR_CHANGE:
+                sets = []
+                self.clear()
+                continue
+            if line[0] == 35:
+                comments += 1
+                continue
+            (left, sep, right) = line.partition(b'\t')
+            key = json.loads(left.decode('utf8'))
+            if sep:
+                sets.append((key, left, right.rstrip(b'\n')))
+            else:
+                if sets:
+                    self._bulkWrite(sets)
+                    sets = []
+                if key in self:
+                    del self[key]
+        if sets:
+            self._bulkWrite(sets)
+        self._savePosition(self._position + sum(len(line) for line in lines))
+        return len(lines) - comments
+
+    def poll(self):
+        # applies the new changes of the source, and returns how many there were
+        changes_path = str(self.source) + CHANGES_SUFFIX
+        if not os.path.exists(changes_path):
+            raise ValueError(f"'{self.source}' has no change log, it must be opened with changelog=True")
+        # a single file object, in case the log is rolled over meanwhile
+        with io.open(changes_path, 'rb', buffering=CHUNK_SIZE) as file:
+            (log_id, base, start) = readChangesHeader(file)
+            end = file.seek(0, os.SEEK_END) + base
+            if log_id != self._log_id or self._position is None or self._position < base + start:
+                # a new follower, the change log was replaced, or the changes it missed were dropped
+                # the copy may miss the last change, which is applied again afterwards
+                self._log_id = log_id
+                self._copyBase(base + lastChange(file, start, end - base))
+            if end == self._position:
+                return 0
+            
+            count = 0
+            lines = []
+            file.seek(self._position - base)
+            for line in file:
+                if not line.endswith(b'\n'):    # still being written
+                    break
+                lines.append(line)
+                if len(lines) >= self.batch:
+                    count += self._apply(lines)
+                    lines = []
+        if lines:
+            count += self._apply(lines)
+        return count
+
+    def follow(self, interval=1.0, stop=None):
+        # keeps applying the changes of the source until `stop` is set
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            self.poll()
+            stop.wait(interval)
+
+
+class FrozenDict(collections.abc.Mapping):
+    """A read-only dictionary written by `Dict.freeze()`, see `open_frozen()`.
+
+    The data file is a compacted dict file. Its index, in the '.idx' file next
+    to it, is a table of (key hash, offset) sorted by hash, preceded by a
+    table giving where each 16 bits hash prefix starts. Both files are memory
+    mapped, so opening is instant and processes opening the same store share
+    them through the page cache, instead of each building an in-memory index.
+
+    Freezing again replaces both files, so processes which have them open
+    keep their mapping of the previous ones. A random stamp, in a comment
+    line of the data file and in the index header, tells whether both files
+    were opened from the same freeze.
+    """
+    INDEX_MAGIC = b'SOSIDX2\n'
+    FANOUT = 1 << 16
+    ENTRY = struct.Struct('<QQ')
+    ENCODER = json_encoder.JSONEncoder(ensure_ascii=False)
+
+    def __init__(self, path, retries=100):
+        self.path = path
+        for attempt in range(retries):
+            with io.open(path, 'rb') as file:
+                self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            with io.open(str(path) + '.idx', 'rb') as file:
+                self._index = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self._index[:len(self.INDEX_MAGIC)] != self.INDEX_MAGIC:
+                raise ValueError(f"'{path}.idx' is not a pysos frozen index")
+            (self._count, stamp) = struct.unpack_from('<Q16s', self._index, len(self.INDEX_MAGIC))
+            start = self._data.find(b'\n') + 1
+            if self._data[start:start + 35] == self.stampLine(stamp):
+                break
+            # opened while being frozen again: the index is replaced first, then the data
+            self.close()
+            time.sleep(0.01)
+        else:
+            raise ValueError(f"'{path}' and its index are not from the same freeze")
+        self._fanout = len(self.INDEX_MAGIC) + 24
+        self._entries = self._fanout + 4 * self.FANOUT
+        logger.info(f"Opened frozen pysos dict '{self.path}' with {self._count} items")
+
+    @staticmethod
+    def encodeKey(key):
+        # the key is always encoded the same way, since it's hashed
+        return FrozenDict.ENCODER.encode(key).encode('utf8')
+
+    @staticmethod
+    def hashKey(left):
+        return int.from_bytes(hashlib.blake2b(left, digest_size=8).digest(), 'little')
+
+    @staticmethod
+    def stampLine(stamp):
+        return b'# ' + stamp.hex().encode('ascii') + b'\n'
+
+    @classmethod
+    def write(cls, path, raw_items, start_flag=Dict.START_FLAG):
+        # both files are written aside and then replaced, never truncated while mapped
+        stamp = uuid.uuid4().bytes
+        entries = []
+        with io.open(str(path) + '.tmp', 'wb', buffering=CHUNK_SIZE) as file:
+            file.write(start_flag)
+            file.write(cls.stampLine(stamp))
+            offset = len(start_flag) + len(cls.stampLine(stamp))
+            for (left, raw) in raw_items:
+                left = cls.encodeKey(json.loads(left.decode('utf8')))
+                line = left + b'\t' + raw + b'\n'
+                file.write(line)
+                entries.append((cls.hashKey(left), offset))
+                offset += len(line)
+        entries.sort()
+        
+        fanout = [0] * cls.FANOUT
+        for (hash, offset) in entries:
+            fanout[hash >> 48] += 1
+        for i in range(1, cls.FANOUT):
+            fanout[i] += fanout[i-1]
+        
+        with io.open(str(path) + '.idx.tmp', 'wb', buffering=CHUNK_SIZE) as file:
+            file.write(cls.INDEX_MAGIC)
+            file.write(struct.pack('<Q16s', len(entries), stamp))
+            file.write(struct.pack('<%dI' % cls.FANOUT, *fanout))
+            for entry in entries:
+                file.write(cls.ENTRY.pack(*entry))
+        os.replace(str(path) + '.idx.tmp', str(path) + '.idx')
+        os.replace(str(path) + '.tmp', path)
+
+    def _readLine(self, key):
+        left = self.encodeKey(key)
+        hash = self.hashKey(left)
+        prefix = hash >> 48
+        lo = struct.unpack_from('<I', self._index, self._fanout + 4 * (prefix - 1))[0] if prefix else 0
+        hi = struct.unpack_from('<I', self._index, self._fanout + 4 * prefix)[0]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.ENTRY.unpack_from(self._index, self._entries + 16 * mid)[0] < hash:
+                lo = mid + 1
+            else:
+                hi = mid
+        # different keys may have the same hash
+        start = left + b'\t'
+        while lo < self._count:
+            (found, offset) = self.ENTRY.unpack_from(self._index, self._entries + 16 * lo)
+            if found != hash:
+                break
+            if self._data[offset:offset + len(start)] == start:
+                return self._data[offset:self._data.find(b'\n', offset) + 1]
+            lo += 1
+        raise KeyError(key)
+
+    def __getitem__(self, key):
+        return parseValue(self._readLine(key))
+
+    def get_path(self, key, path):
+        (left, sep, right) = self._readLine(key).partition(b'\t')
+        return extractPath(right, path)
+
+    def __contains__(self, key):
+        try:
+            self._readLine(key)
+            return True
+        except KeyError:
+            return False
+
+    def __len__(self):
+        return self._count
+
+    def _lines(self):
+        # after the start flag and the stamp line
+        offset = self._data.find(b'\n') + 36
+        while offset < len(self._data):
+            end = self._data.find(b'\n', offset) + 1
+            yield self._data[offset:end]
+            offset = end
+
+    def __iter__(self):
+        for line in self._lines():
+            yield parseKey(line)
+
+    def items(self):
+        for line in self._lines():
+            yield parseLine(line)
+
+    def values(self):
+        for line in self._lines():
+            yield parseValue(line)
+
+    def close(self):
+        self._data.close()
+        self._index.close()
+
+
+def open_frozen(path):
+    return FrozenDict(path)
+
+
+def load(path, lazy=False):
+    if os.path.isdir(path):
+        db = LogDict(path)
+        if isinstance(next(iter(db), None), int):
+            db.close()
+            return List(path, engine='log')
+        return db
+    
     file = open(path, 'rb')
     first = file.readline()
     
     if first == Dict.START_FLAG:
         file.close()
-        return Dict(path)
+        return Dict(path, lazy=lazy)
     if first == List.START_FLAG:
         file.close()
         return List(path)
@@ -421,7 +2435,7 @@ def load(path):
             return List(path)
         else:
             file.close()
-            return Dict(path)
+            return Dict(path, lazy=lazy)
     raise Exception("Empty collection without header. Cannot determine whether it is a list or a dict.")
     
 import csv
@@ -467,3 +2481,77 @@ def csv2sos(path, keys=None, encoding=None, dialect=None):
 
     csvfile.close()    
     sosfile.close()
+
+def exportItems(items, dest, format='ndjson', fields=None, keys=True, start_flag=Dict.START_FLAG, key_column='key'):
+    # items are (key JSON, value JSON) bytes, which are copied as is whenever possible
+    # the values are projected on `fields`, which are the columns in CSV
+    if fields is not None and format != 'csv':
+        items = ((left, json.dumps(extractFields(raw, fields), ensure_ascii=False).encode('utf8')) for (left, raw) in items)
+    if isinstance(dest, List):
+        dest._bulkAppend(raw for (left, raw) in items)
+        return
+    if isinstance(dest, (Dict, LogDict)):
+        dest._bulkWrite((json.loads(left.decode('utf8')), left, raw) for (left, raw) in items)
+        return
+    if not isinstance(dest, (str, os.PathLike)):
+        raise TypeError(f"Can only export to a file path, a Dict, a LogDict or a List, not {type(dest).__name__}")
+    if format not in ('ndjson', 'csv', 'sos'):
+        raise ValueError(f"Unknown export format: {format}")
+    
+    # written aside, so that a failed export leaves no partial file behind
+    tmp = str(dest) + '.tmp'
+    try:
+        if format == 'csv':
+            writeCsv(items, tmp, fields, key_column if keys else None)
+        else:
+            with io.open(tmp, 'wb', buffering=CHUNK_SIZE) as file:
+                if format == 'ndjson':
+                    if keys:
+                        for (left, raw) in items:
+                            file.write(b'[' + left + b',' + raw + b']\n')
+                    else:
+                        for (left, raw) in items:
+                            file.write(raw + b'\n')
+                else:
+                    file.write(start_flag)
+                    for (left, raw) in items:
+                        file.write(left + b'\t' + raw + b'\n')
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    os.replace(tmp, dest)
+
+def writeCsv(items, dest, fields, key_column):
+    with open(dest, 'wt', encoding='utf8', newline='') as file:
+        writer = None
+        selected = fields is not None
+        for (left, raw) in items:
+            if selected:
+                # the columns are named after the paths, values which aren't objects keep their 'value' column too
+                row = extractFields(raw, fields)
+                if raw.lstrip()[:1] != b'{' and 'value' not in row:
+                    row['value'] = json.loads(raw.decode('utf8'))
+            else:
+                value = json.loads(raw.decode('utf8'))
+                row = dict(value) if isinstance(value, dict) else {'value': value}
+            if key_column is not None:
+                if key_column in row:
+                    raise ValueError(f"The value of {left.decode('utf8')} has a field {key_column!r} too, "
+                        "pass another key_column to export")
+                row[key_column] = json.loads(left.decode('utf8'))
+            for (name, cell) in row.items():
+                if isinstance(cell, (dict, list)):
+                    row[name] = json.dumps(cell, ensure_ascii=False)
+            if writer is None:
+                if fields is None:
+                    fields = ([key_column] if key_column is not None else []) + [name for name in row if name != key_column]
+                writer = csv.DictWriter(file, fields, extrasaction='ignore')
+                writer.writeheader()
+                header = set(fields)
+            elif not selected and not header.issuperset(row):
+                # the header comes from the first value, other fields would be lost
+                extra = [name for name in row if name not in header]
+                raise ValueError(f"Fields {extra} of the value of {left.decode('utf8')} are not in the CSV header, "
+                    "which was taken from the first value. Pass the fields to export instead")
+            writer.writerow(row)
@@ -22,5 +22,6 @@ setup(
         'Topic :: Database',
     ],
     keywords='persistent persistence dict list file',
-    install_requires=['chardet']
+    install_requires=['chardet'],
+    extras_require={'columns': ['numpy']}
 )
@@ -18,4 +18,11 @@ for i in range(N):
 dt = time.time() - t
 print(f'Reads: {int(N / dt)} / second')
 
-db.close()
\ No newline at end of file
+db.close()
+
+t = time.time()
+db = pysos.Dict("temp/test.db")
+dt = time.time() - t
+print(f'Opening: {int(N / dt)} items / second')
+
+db.close()
@@ -0,0 +1,80 @@
+import pysos
+import unittest
+import json
+import os
+
+
+class TestBlobs(unittest.TestCase):
+    path = "temp/blobs.sos"
+
+    def setUp(self):
+        self.db = pysos.Dict(self.path, blob_threshold=100)
+        self.db.clear()
+
+    def tearDown(self):
+        self.db.close()
+
+    def blobs(self):
+        return os.listdir(self.path + ".blobs") if os.path.exists(self.path + ".blobs") else []
+
+    def test_big_values_are_stored_out_of_line(self):
+        big = {"text": "x" * 1000}
+        self.db["big"] = big
+        self.db["small"] = "value"
+        assert len(self.blobs()) == 1
+        assert os.path.getsize(self.path) < 100
+        assert self.db["big"] == big
+        assert dict(self.db.items()) == {"big": big, "small": "value"}
+
+        self.db.close()
+        self.db = pysos.Dict(self.path, blob_threshold=100)
+        assert self.db["big"] == big
+
+    def test_open_value_streams_the_json(self):
+        self.db["big"] = ["y" * 1000]
+        self.db["small"] = "value"
+        with self.db.open_value("big") as stream:
+            assert json.loads(stream.read()) == ["y" * 1000]
+        with self.db.open_value("small") as stream:
+            assert json.loads(stream.read()) == "value"
+
+    def test_blobs_are_removed_with_their_items(self):
+        self.db["big"] = "x" * 1000
+        self.db["big"] = "z" * 1000
+        assert len(self.blobs()) == 1
+        assert self.db["big"] == "z" * 1000
+        self.db["big"] = "small again"
+        assert self.blobs() == []
+        self.db["big"] = "x" * 1000
+        del self.db["big"]
+        assert self.blobs() == []
+
+    def test_blobs_are_not_read_by_writes(self):
+        self.db["big"] = "x" * 1000
+        loads = []
+        load = self.db._loadValue
+        self.db._loadValue = lambda right: loads.append(right) or load(right)
+        self.db["big"] = "y" * 1000
+        del self.db["big"]
+        assert loads == []
+        with self.assertRaises(KeyError):
+            del self.db["big"]
+
+        self.db["big"] = "x" * 1000
+        changes = []
+        self.db.observe(lambda key, new, old: changes.append(old))
+        del self.db["big"]
+        assert changes == ["x" * 1000]
+
+    def test_vacuum_removes_orphan_blobs(self):
+        self.db["big"] = "x" * 1000
+        with open(os.path.join(self.path + ".blobs", "orphan"), "wb") as file:
+            file.write(b'"left behind by a crash"')
+        self.db.vacuum()
+        assert len(self.blobs()) == 1
+        assert self.db["big"] == "x" * 1000
+        assert self.db.blob_threshold == 100
+
+
+if __name__ == "__main__":
+    unittest.main()
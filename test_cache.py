@@ -0,0 +1,131 @@
+import os
+import pysos
+import unittest
+import threading
+import time
+
+
+class TestDiskCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = pysos.DiskCache("temp/cache.sos")
+        self.cache.clear()
+
+    def tearDown(self):
+        self.cache.close()
+
+    def test_values_can_be_set_and_get(self):
+        self.cache["key"] = {"some": "value"}
+        assert self.cache["key"] == {"some": "value"}
+        assert dict(self.cache.items()) == {"key": {"some": "value"}}
+        with self.assertRaises(KeyError):
+            self.cache["missing"]
+
+    def test_max_items_evicts_least_recently_used(self):
+        self.cache.max_items = 3
+        for i in range(3):
+            self.cache[i] = "value %d" % i
+        self.cache[0]
+        self.cache[3] = "value 3"
+        assert set(self.cache) == {0, 2, 3}
+        assert 1 not in self.cache._dict
+
+    def test_max_bytes_evicts_and_recycles_lines(self):
+        self.cache.max_bytes = 1000
+        for i in range(100):
+            self.cache["key %d" % i] = "x" * 100
+        assert self.cache.nbytes() <= 1000
+        assert len(self.cache) < 10
+        assert "key 99" in self.cache
+        assert self.cache._dict._free_lines
+
+    def test_max_bytes_bounds_the_file(self):
+        self.cache.max_bytes = 10000
+        for i in range(5000):
+            self.cache["key %d" % i] = "x" * (10 + i * 7 % 500)
+        assert self.cache.nbytes() <= 10000
+        assert os.path.getsize("temp/cache.sos") <= 2 * 10000 + len(pysos.Dict.START_FLAG)
+        assert "key 4999" in self.cache
+
+    def test_ttl_expires_entries(self):
+        self.cache.set("short", 1, ttl=0.01)
+        self.cache.set("long", 2, ttl=100)
+        self.cache["forever"] = 3
+        time.sleep(0.02)
+        assert "short" not in self.cache
+        with self.assertRaises(KeyError):
+            self.cache["short"]
+        assert self.cache.expire() == 0
+        assert dict(self.cache.items()) == {"long": 2, "forever": 3}
+
+    def test_expired_entries_are_not_listed(self):
+        self.cache.set("a", 1, ttl=0.01)
+        self.cache["b"] = 2
+        time.sleep(0.02)
+        assert len(self.cache) == 1
+        assert list(self.cache.keys()) == ["b"]
+        assert dict(self.cache) == {"b": 2}
+
+    def test_recency_is_kept_across_restarts(self):
+        for i in range(3):
+            self.cache[i] = i
+        self.cache[0]
+        self.cache.close()
+
+        self.cache = pysos.DiskCache("temp/cache.sos", max_items=2)
+        assert set(self.cache) == {0, 2}
+
+    def test_recency_is_rebuilt_after_a_crash(self):
+        self.cache.set("a", 1, ttl=100)
+        self.cache["b"] = 2
+        self.cache._dict.close()  # closed without saving the metadata
+
+        self.cache = pysos.DiskCache("temp/cache.sos")
+        assert dict(self.cache.items()) == {"a": 1, "b": 2}
+        assert self.cache._meta["a"][1] is not None
+        assert self.cache._meta["b"][1] is None
+
+    def test_items_while_another_thread_writes(self):
+        for i in range(100):
+            self.cache[i] = "value %d" % i
+        stop = threading.Event()
+        def write():
+            i = 0
+            while not stop.is_set():
+                self.cache[i % 100] = "value %d" % i + "x" * (i % 7)
+                i += 1
+        writer = threading.Thread(target=write)
+        writer.start()
+        try:
+            for i in range(20):
+                items = dict(self.cache.items())
+                assert len(items) == 100
+                assert all(value.startswith("value") for value in items.values())
+        finally:
+            stop.set()
+            writer.join()
+
+    def test_get_or_compute_computes_once(self):
+        calls = []
+        started = threading.Event()
+
+        def compute():
+            calls.append(1)
+            started.set()
+            time.sleep(0.05)
+            return "computed"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.cache.get_or_compute("key", compute))) for i in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results == ["computed"] * 5
+        assert self.cache.get_or_compute("key", compute) == "computed"
+        assert len(calls) == 1
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import pysos
+import unittest
+import os
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+@unittest.skipUnless(numpy, "numpy is not installed")
+class TestColumns(unittest.TestCase):
+    path = "temp/columns.sos"
+
+    def setUp(self):
+        self.db = pysos.Dict(self.path, blob_threshold=200)
+        self.db.clear()
+        for i in range(100):
+            self.db["key %d" % i] = {"price": i * 1.5, "qty": i, "name": "item %d" % i}
+
+    def tearDown(self):
+        self.db.close()
+
+    def check(self, columns):
+        expected = {field: [] for field in columns}
+        for key, value in self.db.items():
+            for field in columns:
+                number = value.get(field) if isinstance(value, dict) else None
+                expected[field].append(number if isinstance(number, (int, float)) else numpy.nan)
+        for field, column in columns.items():
+            numpy.testing.assert_array_equal(numpy.sort(column), numpy.sort(numpy.array(expected[field], dtype=float)))
+
+    def test_columns(self):
+        columns = self.db.to_columns(["price", "qty", "name"])
+        assert columns["price"].sum() == sum(i * 1.5 for i in range(100))
+        assert columns["qty"].dtype == numpy.float64
+        assert numpy.isnan(columns["name"]).all()
+        assert os.path.exists(self.path + ".columns/columns.npz")
+
+    def test_cached_columns_are_patched(self):
+        self.db.to_columns(["price", "qty"])
+        self.db["key 1"] = {"price": 1000, "qty": 1}
+        del self.db["key 2"]
+        self.db["new"] = {"price": 1, "qty": "not a number"}
+        self.db["newer"] = {"price": 2}
+        del self.db["newer"]
+        self.db["big"] = {"price": 3, "text": "x" * 1000}
+        self.db["key 3"] = "not a dict"
+        other = pysos.Dict("temp/columns-other.sos")
+        other.clear()
+        other["bulk"] = {"price": 7, "qty": 7}
+        other.export(self.db)
+        other.close()
+
+        self.db.close()
+        self.db = pysos.Dict(self.path, blob_threshold=200)
+        changes = os.path.getsize(self.path + ".columns/changes")
+        assert changes > 0
+        self.check(self.db.to_columns(["price", "qty"]))
+        assert os.path.getsize(self.path + ".columns/changes") == 0
+        self.check(self.db.to_columns(["qty"]))
+
+    def test_new_fields_rebuild_the_cache(self):
+        self.db.to_columns(["price"])
+        self.db["key 1"] = {"price": 1000, "qty": 1000}
+        self.check(self.db.to_columns(["qty"]))
+        self.check(self.db.to_columns(["price", "qty"]))
+
+    def test_clear_drops_the_cache(self):
+        self.db.to_columns(["price"])
+        self.db.clear()
+        assert not os.path.exists(self.path + ".columns")
+        self.db["key"] = {"price": 1}
+        assert self.db.to_columns(["price"])["price"].tolist() == [1]
+
+    def test_missing_cache_file_is_rebuilt(self):
+        # as if the process died after creating the directory, before writing the cache
+        self.db.close()
+        os.makedirs(self.path + ".columns", exist_ok=True)
+        with open(self.path + ".columns/changes", "wb") as file:
+            file.write(b'"key 1"\t1\n')
+        self.db = pysos.Dict(self.path, blob_threshold=200)
+        self.check(self.db.to_columns(["price"]))
+
+        with open(self.path + ".columns/columns.npz", "wb") as file:
+            file.write(b"garbage")
+        self.check(self.db.to_columns(["price"]))
+
+    def test_cache_is_dropped_once_changes_outgrow_the_file(self):
+        self.db.to_columns(["price"])
+        for i in range(30):
+            self.db["key 1"] = {"price": i, "text": "x" * 100}
+        assert os.path.exists(self.path + ".columns/changes")
+        for i in range(100):
+            self.db["key 1"] = {"price": i, "text": "x" * 100}
+        assert not os.path.exists(self.path + ".columns")
+        self.check(self.db.to_columns(["price"]))
+
+    def test_parallel_scan(self):
+        pysos.CHUNK_SIZE, old = 64, pysos.CHUNK_SIZE
+        try:
+            (keys, columns) = pysos.scanColumnsParallel(self.path, ["qty"], workers=3)
+        finally:
+            pysos.CHUNK_SIZE = old
+        assert keys == list(self.db.keys())
+        assert columns[0] == list(range(100))
+
+    def test_list_order(self):
+        items = pysos.List("temp/columns-list.sos")
+        items.clear()
+        items.extend([{"x": 2}, {"x": 3}])
+        items.insert(0, {"x": 1})
+        assert items.to_columns(["x"])["x"].tolist() == [1, 2, 3]
+        items.close()
+
+    def test_log_engine(self):
+        items = pysos.List("temp/columns-log-list", engine="log")
+        items.clear()
+        items.extend([{"x": 2}, {"x": 3}, "not a dict"])
+        items.insert(0, {"x": 1})
+        numpy.testing.assert_array_equal(items.to_columns(["x"])["x"], [1, 2, 3, numpy.nan])
+        items.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+import pysos
+import unittest
+import csv
+import os
+import json
+
+
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        self.db = pysos.Dict("temp/export.sos", blob_threshold=100)
+        self.db.clear()
+        self.db["a"] = {"name": "first", "tags": [1, 2]}
+        self.db["b"] = {"name": "deleted"}
+        self.db[3] = {"name": "big", "text": "x" * 1000}
+        del self.db["b"]
+        self.db["a"] = {"name": "updated", "tags": [1, 2]}
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_ndjson(self):
+        self.db.export("temp/export.ndjson")
+        with open("temp/export.ndjson", encoding="utf8") as file:
+            items = dict(json.loads(line) for line in file)
+        assert items == {"a": self.db["a"], 3: self.db[3]}
+
+    def test_fields_project_the_values(self):
+        self.db.export("temp/export.ndjson", fields=["name", "tags[0]"])
+        with open("temp/export.ndjson", encoding="utf8") as file:
+            items = dict(json.loads(line) for line in file)
+        assert items == {"a": {"name": "updated", "tags[0]": 1}, 3: {"name": "big"}}
+
+        copy = pysos.Dict("temp/export-copy.sos")
+        copy.clear()
+        self.db.export(copy, fields=["name"])
+        assert dict(copy.items()) == {"a": {"name": "updated"}, 3: {"name": "big"}}
+        copy.close()
+
+    def test_unsupported_destination(self):
+        queue = pysos.Queue("temp/export-queue")
+        with self.assertRaises(TypeError):
+            self.db.export(queue)
+        queue.close()
+        assert not os.path.exists(repr(queue))
+
+    def test_csv(self):
+        self.db.export("temp/export.csv", format="csv", fields=["key", "name", "tags"])
+        with open("temp/export.csv", encoding="utf8", newline="") as file:
+            rows = list(csv.DictReader(file))
+        assert rows == [
+            {"key": "3", "name": "big", "tags": ""},
+            {"key": "a", "name": "updated", "tags": "[1, 2]"},
+        ]
+
+        self.db.export("temp/export.csv", format="csv", fields=["key", "tags[1]"])
+        with open("temp/export.csv", encoding="utf8", newline="") as file:
+            rows = list(csv.DictReader(file))
+        assert rows == [{"key": "3", "tags[1]": ""}, {"key": "a", "tags[1]": "2"}]
+
+        items = pysos.List("temp/export-list.sos")
+        items.clear()
+        items.extend([1, {"value": 2}, [3]])
+        items.export("temp/export.csv", format="csv", fields=["value", "[0]"])
+        with open("temp/export.csv", encoding="utf8", newline="") as file:
+            rows = list(csv.DictReader(file))
+        assert rows == [{"value": "1", "[0]": ""}, {"value": "2", "[0]": ""}, {"value": "[3]", "[0]": "3"}]
+        items.close()
+
+    def test_csv_fields_missing_from_the_header(self):
+        db = pysos.Dict("temp/export-fields.sos")
+        db.clear()
+        db["a"] = {"x": 1}
+        db["b"] = {"x": 2, "y": 3}
+        with self.assertRaises(ValueError):
+            db.export("temp/export-fields.csv", format="csv")
+        db.export("temp/export-fields.csv", format="csv", fields=["key", "x", "y"])
+        with open("temp/export-fields.csv", encoding="utf8", newline="") as file:
+            rows = list(csv.DictReader(file))
+        assert rows == [{"key": "a", "x": "1", "y": ""}, {"key": "b", "x": "2", "y": "3"}]
+
+        # fields missing from later values are fine
+        db.clear()
+        db["b"] = {"x": 2, "y": 3}
+        db["c"] = {"x": 4}
+        db.export("temp/export-fields.csv", format="csv")
+        with open("temp/export-fields.csv", encoding="utf8", newline="") as file:
+            rows = list(csv.DictReader(file))
+        assert rows == [{"key": "b", "x": "2", "y": "3"}, {"key": "c", "x": "4", "y": ""}]
+        db.close()
+
+    def test_csv_key_column(self):
+        db = pysos.Dict("temp/export-fields.sos")
+        db.clear()
+        db["a"] = {"key": "K1", "n": 1}
+        with self.assertRaises(ValueError):
+            db.export("temp/export-key.csv", format="csv")
+        db.export("temp/export-key.csv", format="csv", key_column="id")
+        with open("temp/export-key.csv", encoding="utf8", newline="") as file:
+            rows = list(csv.DictReader(file))
+        assert rows == [{"id": "a", "key": "K1", "n": "1"}]
+        db.close()
+
+    def test_failed_export_leaves_no_file(self):
+        db = pysos.Dict("temp/export-fields.sos")
+        db.clear()
+        db["a"] = {"x": 1}
+        db["b"] = {"x": 2, "y": 3}
+        if os.path.exists("temp/export-failed.csv"):
+            os.remove("temp/export-failed.csv")
+        with self.assertRaises(ValueError):
+            db.export("temp/export-failed.csv", format="csv")
+        assert not os.path.exists("temp/export-failed.csv")
+        assert not os.path.exists("temp/export-failed.csv.tmp")
+        db.close()
+
+    def test_sos_copy_is_loadable(self):
+        self.db.export("temp/export-copy.sos", format="sos")
+        copy = pysos.load("temp/export-copy.sos")
+        assert dict(copy.items()) == dict(self.db.items())
+        copy.close()
+
+    def test_pipe_into_other_stores(self):
+        dest = pysos.Dict("temp/export-dest.sos")
+        dest.clear()
+        dest["a"] = "will be replaced"
+        dest["other"] = "stays"
+        self.db.export(dest)
+        assert dict(dest.items()) == {"a": self.db["a"], 3: self.db[3], "other": "stays"}
+        dest.close()
+        dest = pysos.Dict("temp/export-dest.sos")
+        assert dict(dest.items()) == {"a": self.db["a"], 3: self.db[3], "other": "stays"}
+        dest.close()
+
+        log = pysos.LogDict("temp/export-dest-log")
+        log.clear()
+        self.db.export(log)
+        assert dict(log.items()) == dict(self.db.items())
+        log.close()
+
+    def test_list_in_order(self):
+        source = pysos.List("temp/export-list.sos")
+        source.clear()
+        source.extend(["b", "c"])
+        source.insert(0, "a")
+        source[1] = "B"
+
+        source.export("temp/export-list.ndjson", ordered=True)
+        with open("temp/export-list.ndjson", encoding="utf8") as file:
+            assert [json.loads(line) for line in file] == ["a", "B", "c"]
+
+        dest = pysos.List("temp/export-list-dest.sos")
+        dest.clear()
+        dest.append("first")
+        source.export(dest, ordered=True)
+        assert list(dest) == ["first", "a", "B", "c"]
+        dest.close()
+
+        source.export("temp/export-list-copy.sos", format="sos")
+        copy = pysos.load("temp/export-list-copy.sos")
+        assert isinstance(copy, pysos.List)
+        assert list(copy) == ["a", "B", "c"]
+        copy.close()
+        source.close()
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            self.db.export("temp/export.xml", format="xml")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import pysos
+import unittest
+import multiprocessing
+import os
+
+
+def lookup(args):
+    (path, key) = args
+    db = pysos.open_frozen(path)
+    try:
+        return db[key]
+    finally:
+        db.close()
+
+
+class TestFrozen(unittest.TestCase):
+    path = "temp/frozen.sos"
+
+    def setUp(self):
+        db = pysos.Dict("temp/to-freeze.sos", blob_threshold=100)
+        db.clear()
+        self.reference = {}
+        for i in range(1000):
+            db["key %d" % i] = {"value": i}
+            self.reference["key %d" % i] = {"value": i}
+        for i in range(0, 1000, 3):
+            del db["key %d" % i]
+            del self.reference["key %d" % i]
+        for key in (1, -2, 1.5, None, "unicode é/\"", "big"):
+            db[key] = "x" * 1000 if key == "big" else str(key)
+            self.reference[key] = db[key]
+        db.freeze(self.path)
+        db.close()
+        self.db = pysos.open_frozen(self.path)
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_lookups(self):
+        assert len(self.db) == len(self.reference)
+        for key, value in self.reference.items():
+            assert self.db[key] == value
+            assert key in self.db
+        assert "key 0" not in self.db
+        with self.assertRaises(KeyError):
+            self.db["missing"]
+        assert self.db.get_path("key 1", "value") == 1
+
+    def test_iteration(self):
+        assert set(self.db) == set(self.reference)
+        assert dict(self.db.items()) == self.reference
+        assert dict(self.db) == self.reference
+
+    def test_frozen_file_is_a_compacted_dict(self):
+        db = pysos.Dict(self.path)
+        assert dict(db.items()) == self.reference
+        # only the comment line with the stamp of the freeze
+        assert db._free_lines == [(35, len(pysos.Dict.START_FLAG))]
+        db.close()
+
+    def test_freezing_again_keeps_open_mappings(self):
+        db = pysos.Dict("temp/to-freeze.sos")
+        db["key 1"] = "changed"
+        db.freeze(self.path)
+        db.close()
+        # the previous files are still mapped, and consistent
+        assert self.db["key 1"] == {"value": 1}
+        assert self.db["key 2"] == {"value": 2}
+        fresh = pysos.open_frozen(self.path)
+        assert fresh["key 1"] == "changed"
+        assert fresh["key 2"] == {"value": 2}
+        fresh.close()
+
+    def test_data_and_index_of_different_freezes(self):
+        os.replace(self.path + ".idx", "temp/frozen-old.idx")
+        db = pysos.Dict("temp/to-freeze.sos")
+        db.freeze(self.path)
+        db.close()
+        os.replace("temp/frozen-old.idx", self.path + ".idx")
+        with self.assertRaises(ValueError):
+            pysos.FrozenDict(self.path, retries=2)
+
+    def test_shared_by_forked_workers(self):
+        with multiprocessing.Pool(2) as pool:
+            assert pool.map(lookup, [(self.path, "key 1"), (self.path, 1)]) == [{"value": 1}, "1"]
+
+
+if __name__ == "__main__":
+    unittest.main()
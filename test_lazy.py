@@ -0,0 +1,136 @@
+import pysos
+import unittest
+import json
+import threading
+
+N = 50000
+
+
+class TestLazyDict(unittest.TestCase):
+    path = "temp/lazy.sos"
+
+    def setUp(self):
+        # written directly, it's much faster than going through the dict
+        with open(self.path, "wb") as file:
+            file.write(pysos.Dict.START_FLAG)
+            for i in range(N):
+                file.write(("%s\t%s\n" % (json.dumps("key_%d" % i), json.dumps({"some": i}))).encode("utf8"))
+                if i % 10 == 0:
+                    file.write(b"# some freed line\n")
+
+    def test_lookups_while_indexing(self):
+        db = pysos.Dict(self.path, lazy=True)
+        assert db["key_%d" % (N - 1)] == {"some": N - 1}
+        assert "key_123" in db
+        assert "missing" not in db
+        assert len(db) == N
+        db.close()
+
+    def test_same_index_as_eager_open(self):
+        db = pysos.Dict(self.path, lazy=True)
+        db._waitIndex()
+        eager = pysos.Dict(self.path)
+        assert db._offsets == eager._offsets
+        assert db._free_lines == eager._free_lines
+        eager.close()
+        db.close()
+
+    def test_writes_while_indexing(self):
+        db = pysos.Dict(self.path, lazy=True)
+        db["key_%d" % (N - 2)] = "updated"
+        del db["key_%d" % (N - 3)]
+        db["new"] = "value"
+        db["key_7"] = "updated too"
+        assert db["key_%d" % (N - 2)] == "updated"
+        assert len(db) == N
+        db.close()
+
+        db = pysos.Dict(self.path)
+        assert db["key_%d" % (N - 2)] == "updated"
+        assert "key_%d" % (N - 3) not in db
+        assert db["new"] == "value"
+        assert db["key_7"] == "updated too"
+        assert len(db) == N
+        assert len(list(db.items())) == N
+        db.close()
+
+    def test_new_keys_do_not_wait_for_the_index(self):
+        # the index is not built before the key is inserted
+        release = threading.Event()
+        scanIndex = pysos.scanIndex
+        def slowScanIndex(*args):
+            release.wait(10)
+            yield from scanIndex(*args)
+        pysos.scanIndex = slowScanIndex
+        try:
+            with open(self.path, "ab") as file:
+                file.write(b'"\\u00e9t\\u00e9"\t"escaped"\n')
+            db = pysos.Dict(self.path, lazy=True)
+            db["new"] = "value"
+            db["\u00e9t\u00e9"] = "written as pysos writes it"
+            assert db._indexing
+        finally:
+            release.set()
+            pysos.scanIndex = scanIndex
+        assert db["new"] == "value"
+        assert len(db) == N + 2
+        db.close()
+
+        # the line with the key encoded otherwise was freed
+        db = pysos.Dict(self.path)
+        assert db["\u00e9t\u00e9"] == "written as pysos writes it"
+        assert len(db) == N + 2
+        assert len(list(db.items())) == N + 2
+        db.close()
+
+    def test_writes_do_not_scan_without_observers(self):
+        db = pysos.Dict(self.path, lazy=True)
+        scans = []
+        db._scanFor = lambda key: scans.append(key)
+        db["new"] = 1
+        db["key_%d" % (N - 1)] = "updated"
+        assert scans == []
+        db._waitIndex()
+        assert db["key_%d" % (N - 1)] == "updated"
+        assert len(db) == N + 1
+        db.close()
+
+        db = pysos.Dict(self.path)
+        assert db["key_%d" % (N - 1)] == "updated"
+        assert len(list(db.items())) == N + 1
+        db.close()
+
+    def test_scans_after_writes_while_indexing(self):
+        db = pysos.Dict(self.path, lazy=True)
+        key = "key_%d" % (N - 1)
+        db[key] = "new"
+        items = dict(db.items())
+        assert len(items) == N
+        assert items[key] == "new"
+        assert len(list(db._rawItems())) == N
+        db.freeze("temp/lazy-frozen.sos")
+        frozen = pysos.open_frozen("temp/lazy-frozen.sos")
+        assert frozen[key] == "new"
+        assert len(frozen) == N
+        frozen.close()
+        db.close()
+
+    def test_clear_after_indexing_found_older_lines(self):
+        with open(self.path, "ab") as file:
+            file.write(b'"\\u00e9"\t1\n')
+        db = pysos.Dict(self.path, lazy=True)
+        db["\u00e9"] = 2
+        db._waitIndex()
+        db.clear()
+        db["a"] = 1
+        assert dict(db.items()) == {"a": 1}
+        db.close()
+
+    def test_close_while_indexing(self):
+        db = pysos.Dict(self.path, lazy=True)
+        db.close()
+        assert not db._indexing
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import pysos
+import unittest
+import os
+
+
+class TestLogDict(unittest.TestCase):
+    path = "temp/log-dict"
+
+    def setUp(self):
+        self.db = pysos.LogDict(self.path, max_segment_size=1000, merge_after=None)
+        self.db.clear()
+
+    def tearDown(self):
+        self.db.close()
+
+    def reopen(self):
+        self.db.close()
+        self.db = pysos.LogDict(self.path, max_segment_size=1000, merge_after=None)
+
+    def test_values_can_be_set_updated_and_deleted(self):
+        self.db["key"] = "value"
+        self.db["other"] = [1, 2, 3]
+        self.db["key"] = "updated"
+        del self.db["other"]
+        assert dict(self.db.items()) == {"key": "updated"}
+        with self.assertRaises(KeyError):
+            del self.db["other"]
+        self.reopen()
+        assert dict(self.db.items()) == {"key": "updated"}
+
+    def test_segments_are_sealed_with_hints(self):
+        for i in range(100):
+            self.db["key %d" % i] = "value %d" % i
+        for i in range(0, 100, 2):
+            del self.db["key %d" % i]
+        assert len(self.db._sealed) > 1
+        for segment in self.db._sealed:
+            assert os.path.exists(self.db._filename(segment, pysos.LogDict.HINT))
+        self.reopen()
+        assert dict(self.db.items()) == {"key %d" % i: "value %d" % i for i in range(1, 100, 2)}
+
+    def test_merge_keeps_live_items_only(self):
+        for i in range(100):
+            self.db["key %d" % (i % 10)] = "value %d" % i
+        del self.db["key 0"]
+        size_before = self.db.size()
+        self.db.vacuum()
+        assert self.db.size() < size_before
+        assert self.db._sealed == [self.db._listSegments()[0]]
+        expected = {"key %d" % i: "value %d" % (90 + i) for i in range(1, 10)}
+        assert dict(self.db.items()) == expected
+        self.reopen()
+        assert dict(self.db.items()) == expected
+
+    def test_background_merge_while_writing(self):
+        self.db.merge_after = 3
+        for i in range(1000):
+            self.db["key %d" % (i % 50)] = i
+        self.db.merge(wait=True)
+        expected = {"key %d" % i: 950 + i for i in range(50)}
+        assert dict(self.db.items()) == expected
+        self.reopen()
+        assert dict(self.db.items()) == expected
+
+    def test_incomplete_write_is_ignored(self):
+        self.db["key"] = "value"
+        self.db.close()
+        with open(self.db._filename(self.db._active, pysos.LogDict.SEGMENT), "ab") as file:
+            file.write(b'"broken"\t"val')
+        self.db = pysos.LogDict(self.path)
+        assert dict(self.db.items()) == {"key": "value"}
+        self.db["other"] = "value"
+        self.reopen()
+        assert dict(self.db.items()) == {"key": "value", "other": "value"}
+
+    def test_list_engine(self):
+        db = pysos.List("temp/log-list", engine="log")
+        db.clear()
+        db.extend([1, 2, 3])
+        db.insert(0, 0)
+        del db[2]
+        db.close()
+        db = pysos.load("temp/log-list")
+        assert isinstance(db, pysos.List)
+        assert list(db) == [0, 1, 3]
+        db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import pysos
+import unittest
+import json
+
+DOC = {
+    "a": {"b": [0, 1, 2, {"c": "found \" ] } with tricky chars"}], "x": None},
+    "unicode é\"": [1.5e3, True],
+    "empty": [],
+    "nested": {"list": [[1, 2], [3, [4, 5]]]},
+}
+
+
+class TestPath(unittest.TestCase):
+    def setUp(self):
+        self.db = pysos.Dict("temp/path.sos")
+        self.db.clear()
+        self.db["doc"] = DOC
+        self.db["other"] = {"a": {"x": 1}}
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_parse_path(self):
+        assert pysos.parsePath("a.b[3].c") == ("a", "b", 3, "c")
+        assert pysos.parsePath("[0][-1]") == (0, -1)
+
+    def test_extract_path(self):
+        raw = json.dumps(DOC).encode("utf8")
+        assert pysos.extractPath(raw, "a.b[3].c") == DOC["a"]["b"][3]["c"]
+        assert pysos.extractPath(raw, "a.b[-1]") == DOC["a"]["b"][-1]
+        assert pysos.extractPath(raw, "unicode é\"[1]") is True
+        assert pysos.extractPath(raw, "nested.list[1][1][0]") == 4
+        assert pysos.extractPath(raw, "nested") == DOC["nested"]
+        assert pysos.extractPath(b' [1 , {"k" :  2}] ', "[1].k") == 2
+        with self.assertRaises(KeyError):
+            pysos.extractPath(raw, "a.missing")
+        with self.assertRaises(IndexError):
+            pysos.extractPath(raw, "empty[0]")
+        with self.assertRaises(TypeError):
+            pysos.extractPath(raw, "a.x.y")
+
+    def test_extract_fields(self):
+        fields = ["a.b[3].c", "a.b[-1]", "a", "nested.list[1][1][0]", "a.missing", "empty[0]", "a.x.y", "padding[-1]"]
+        for padding in ([], ["x" * 100] * 100):   # decoded at once, or stepped through
+            doc = dict(DOC, padding=padding)
+            raw = json.dumps(doc).encode("utf8")
+            assert pysos.extractFields(raw, fields) == {
+                field: pysos.extractPath(raw, field) for field in fields
+                if field not in ("a.missing", "empty[0]", "a.x.y") and (padding or field != "padding[-1]")
+            }
+
+    def test_extract_from_big_values(self):
+        tricky = ["a], {[", "s\"]}{[", {"x": [1, "]"]}, [[], {}], "\\"]
+        doc = {"tricky": tricky * 500, "z": {"c": [tricky, {"d": "end"}]}}
+        raw = json.dumps(doc).encode("utf8")
+        assert pysos.extractPath(raw, "tricky[0]") == "a], {["
+        assert pysos.extractPath(raw, "tricky[1502]") == {"x": [1, "]"]}
+        assert pysos.extractPath(raw, "tricky[-1]") == "\\"
+        assert pysos.extractPath(raw, "tricky[-2497]") == [[], {}]
+        assert pysos.extractPath(raw, "z.c[0][2].x[1]") == "]"
+        assert pysos.extractFields(raw, ["z.c[1].d", "tricky[1]"]) == {"z.c[1].d": "end", "tricky[1]": 's"]}{['}
+        with self.assertRaises(IndexError):
+            pysos.extractPath(raw, "tricky[2500]")
+        with self.assertRaises(KeyError):
+            pysos.extractPath(raw, "z.x")
+
+    def test_get_path(self):
+        assert self.db.get_path("doc", "a.b[3].c") == DOC["a"]["b"][3]["c"]
+        with self.assertRaises(KeyError):
+            self.db.get_path("missing", "a")
+
+    def test_get_many(self):
+        assert self.db.get_many(["doc", "missing", "other"]) == [DOC, None, {"a": {"x": 1}}]
+        assert self.db.get_many(["doc", "other"], fields=["a.x", "empty"]) == [
+            {"a.x": None, "empty": []},
+            {"a.x": 1},
+        ]
+
+    def test_items_with_fields(self):
+        assert dict(self.db.items(fields=["a.x"])) == {"doc": {"a.x": None}, "other": {"a.x": 1}}
+
+    def test_log_dict_and_list(self):
+        log = pysos.LogDict("temp/path-log")
+        log.clear()
+        log["doc"] = DOC
+        assert log.get_path("doc", "nested.list[1]") == DOC["nested"]["list"][1]
+        assert dict(log.items(fields=["empty"])) == {"doc": {"empty": []}}
+        log.close()
+
+        items = pysos.List("temp/path-list")
+        items.clear()
+        items.extend([DOC, DOC])
+        assert items.get_path(-1, "a.b[2]") == 2
+        items.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
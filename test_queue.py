@@ -0,0 +1,133 @@
+import pysos
+import unittest
+
+
+class TestQueue(unittest.TestCase):
+    path = "temp/queue.sos"
+
+    def setUp(self):
+        self.queue = pysos.Queue(self.path)
+        self.queue.clear()
+
+    def tearDown(self):
+        self.queue.close()
+
+    def reopen(self):
+        self.queue.close()
+        self.queue = pysos.Queue(self.path)
+
+    def test_both_ends(self):
+        self.queue.append(2)
+        self.queue.append(3)
+        self.queue.appendleft(1)
+        self.queue.appendleft(0)
+        assert list(self.queue) == [0, 1, 2, 3]
+        self.reopen()
+        assert self.queue.popleft() == 0
+        assert self.queue.pop() == 3
+        assert list(self.queue) == [1, 2]
+        assert len(self.queue) == 2
+        assert self.queue.popleft() == 1
+        assert self.queue.popleft() == 2
+        assert not self.queue
+        with self.assertRaises(IndexError):
+            self.queue.popleft()
+        with self.assertRaises(IndexError):
+            self.queue.pop()
+
+    def test_consumed_space_is_reused(self):
+        import os
+        for i in range(1000):
+            self.queue.append("item")
+            self.queue.popleft()
+        # one freed line per key width, instead of a thousand lines
+        assert os.path.getsize(self.path) < 100
+
+    def test_get_many_and_ack(self):
+        for i in range(10):
+            self.queue.append(i)
+        batch = self.queue.get_many(3)
+        assert [value for (key, value) in batch] == [0, 1, 2]
+        assert [value for (key, value) in self.queue.get_many(3)] == [3, 4, 5]
+        self.queue.ack(batch[-1][0])
+        assert list(self.queue) == list(range(3, 10))
+
+        # not acknowledged items are delivered again after a restart
+        self.reopen()
+        assert [value for (key, value) in self.queue.get_many(2)] == [3, 4]
+
+    def test_items_are_removed_once_acknowledged_by_all_consumers(self):
+        for i in range(5):
+            self.queue.append(i)
+        fast = self.queue.get_many(5, consumer="fast")
+        slow = self.queue.get_many(2, consumer="slow")
+        self.queue.ack(fast[-1][0], consumer="fast")
+        assert list(self.queue) == [0, 1, 2, 3, 4]
+        self.queue.ack(slow[-1][0], consumer="slow")
+        assert list(self.queue) == [2, 3, 4]
+        assert sorted(self.queue.consumers()) == ["fast", "slow"]
+
+        # the items only the removed consumer was holding back are removed with it
+        self.queue.remove_consumer("slow")
+        assert list(self.queue) == [] and len(self.queue) == 0
+        self.queue.ack(fast[-1][0], consumer="fast")
+        assert list(self.queue) == []
+        self.queue.append(5)
+        assert [value for (key, value) in self.queue.get_many(10, consumer="fast")] == [5]
+
+    def test_drained_queue_is_consumed_after_reopening(self):
+        for i in range(5):
+            self.queue.append(i)
+        batch = self.queue.get_many(10, consumer="w")
+        self.queue.ack(batch[-1][0], consumer="w")
+        assert list(self.queue) == []
+        self.reopen()
+        self.queue.append("new job A")
+        self.queue.append("new job B")
+        self.queue.ack(0, consumer="other")
+        assert [value for (key, value) in self.queue.get_many(10, consumer="w")] == ["new job A", "new job B"]
+
+    def test_popped_keys_are_not_reused(self):
+        self.queue.append("a")
+        self.queue.append("b")
+        assert [value for (key, value) in self.queue.get_many(10, consumer="w")] == ["a", "b"]
+        assert self.queue.pop() == "b"
+        self.queue.append("c")
+        assert [value for (key, value) in self.queue.get_many(10, consumer="w")] == ["c"]
+
+    def test_appendleft_with_consumers(self):
+        self.queue.append("job")
+        self.queue.get_many(1, consumer="w")
+        with self.assertRaises(ValueError):
+            self.queue.appendleft("urgent")
+        self.queue.remove_consumer("w")
+        self.queue.appendleft("urgent")
+        assert [value for (key, value) in self.queue.get_many(10, consumer="w")] == ["urgent", "job"]
+
+    def test_out_of_order_acks(self):
+        for i in range(5):
+            self.queue.append(i)
+        batch = self.queue.get_many(5)
+        self.queue.ack(batch[3][0])
+        self.queue.ack(batch[0][0])
+        assert list(self.queue) == [4]
+        self.reopen()
+        assert [value for (key, value) in self.queue.get_many(10)] == [4]
+
+    def test_gaps_left_by_a_list(self):
+        items = pysos.List("temp/queue-list.sos")
+        items.clear()
+        items.extend([0, 1, 2, 3, 4])
+        del items[1]
+        del items[2]
+        items.close()
+        queue = pysos.Queue("temp/queue-list.sos")
+        assert list(queue) == [0, 2, 4]
+        assert [value for (key, value) in queue.get_many(2)] == [0, 2]
+        assert queue.popleft() == 0
+        assert queue.popleft() == 2
+        queue.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,261 @@
+import pysos
+import unittest
+import os
+import shutil
+import multiprocessing
+
+
+def updateBlobs(path, started, stop):
+    db = pysos.Dict(path, changelog=True, blob_threshold=100)
+    i = 0
+    while not stop.is_set():
+        db["hot %d" % (i * 7 % 1000)] = "x" * (200 + i % 50)
+        i += 1
+        if i == 100:
+            started.set()
+    db.close()
+
+
+class TestReplication(unittest.TestCase):
+    path = "temp/leader.sos"
+    backup = "temp/backup.sos"
+
+    def setUp(self):
+        for path in (self.path + ".changes", self.backup, self.backup + ".follow"):
+            if os.path.exists(path):
+                os.remove(path)
+        if os.path.exists(self.path + ".followers"):
+            shutil.rmtree(self.path + ".followers")
+        self.db = pysos.Dict(self.path, changelog=True, blob_threshold=100)
+        self.db.clear()
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_change_log(self):
+        self.db["key"] = "value"
+        self.db["big"] = "x" * 1000
+        del self.db["key"]
+        with open(self.path + ".changes", "rb") as file:
+            lines = file.readlines()
+        assert lines[-3:] == [b'"key"\t"value"\n', b'"big"\t"' + b"x" * 1000 + b'"\n', b'"key"\n']
+
+    def test_incremental_backup(self):
+        for i in range(100):
+            self.db["key %d" % i] = i
+        self.db.backup(self.backup)
+
+        copy = pysos.Dict(self.backup)
+        assert dict(copy.items()) == dict(self.db.items())
+        copy.close()
+        size = os.path.getsize(self.backup)
+
+        self.db["key 0"] = "updated"
+        self.db["big"] = "x" * 1000
+        del self.db["key 1"]
+        self.db.backup(self.backup)
+
+        copy = pysos.Dict(self.backup)
+        assert dict(copy.items()) == dict(self.db.items())
+        copy.close()
+        # only the changes were shipped, the copy was not rewritten
+        assert os.path.getsize(self.backup) < size + 1100
+
+    def test_backup_without_changes_does_not_open_the_copy(self):
+        self.db["key"] = "value"
+        self.db.backup(self.backup)
+        os.rename(self.backup, self.backup + ".moved")
+        self.db.backup(self.backup)
+        # opening the copy would have created a new file
+        assert not os.path.exists(self.backup)
+        os.rename(self.backup + ".moved", self.backup)
+
+    def test_backup_to_an_open_follower(self):
+        follower = pysos.Follower(self.backup, self.path)
+        for i in range(3):
+            self.db["key %d" % i] = i
+            self.db.backup(follower)
+            assert dict(follower.items()) == dict(self.db.items())
+        follower.close()
+
+    def test_follower_applies_changes_in_batches(self):
+        self.db["before"] = 1
+        follower = pysos.Follower(self.backup, self.path, batch=3)
+        assert follower.poll() == 1   # the last change is applied again after the copy
+        assert dict(follower.items()) == {"before": 1}
+
+        for i in range(10):
+            self.db[i] = i
+        del self.db["before"]
+        assert follower.poll() == 11
+        assert dict(follower.items()) == dict(self.db.items())
+        assert follower.poll() == 0
+
+        self.db.clear()
+        self.db["after"] = "clear"
+        follower.poll()
+        assert dict(follower.items()) == {"after": "clear"}
+        follower.close()
+
+    def test_backup_size_follows_the_store_size(self):
+        for i in range(100):
+            self.db["key %d" % i] = {"round": 0, "text": "x" * 50}
+        for round in range(20):
+            for i in range(100):
+                self.db["key %d" % i] = {"round": round, "text": "x" * 50}
+            self.db.backup(self.backup)
+        copy = pysos.Dict(self.backup)
+        assert dict(copy.items()) == dict(self.db.items())
+        assert len(copy._free_lines) <= 200   # not one per change
+        copy.close()
+        assert os.path.getsize(self.backup) < 2 * os.path.getsize(self.path)
+
+    def test_backup_while_another_process_updates_blobs(self):
+        for i in range(1000):
+            self.db["hot %d" % i] = "x" * 200
+        self.db.close()
+        started = multiprocessing.Event()
+        stop = multiprocessing.Event()
+        writer = multiprocessing.Process(target=updateBlobs, args=(self.path, started, stop))
+        writer.start()
+        try:
+            started.wait(10)
+            for i in range(5):
+                if os.path.exists(self.backup + ".follow"):
+                    os.remove(self.backup + ".follow")
+                follower = pysos.Follower(self.backup, self.path)
+                follower.poll()
+                follower.close()
+        finally:
+            stop.set()
+            writer.join()
+
+        self.db = pysos.Dict(self.path, changelog=True, blob_threshold=100)
+        follower = pysos.Follower(self.backup, self.path)
+        follower.poll()
+        assert dict(follower.items()) == dict(self.db.items())
+        follower.close()
+
+    def pollWhileWriting(self):
+        # the follower copies the dict while a logged change is only partly written to it
+        follower = pysos.Follower(self.backup, self.path)
+        freeLine = self.db._freeLine
+        def pollFirst(offset):
+            if self.db._freeLine is not freeLine:
+                self.db._freeLine = freeLine
+                follower.poll()
+            freeLine(offset)
+        self.db._freeLine = pollFirst
+        return follower
+
+    def test_follower_copying_during_a_change(self):
+        for key in "abc":
+            self.db[key] = 1
+        follower = self.pollWhileWriting()
+        del self.db["a"]
+        follower.poll()
+        assert dict(follower.items()) == {"b": 1, "c": 1}
+        follower.close()
+
+    def test_follower_copying_during_a_batch(self):
+        for key in "abc":
+            self.db[key] = 1
+        follower = self.pollWhileWriting()
+        self.db._bulkWrite([(key, b'"%s"' % key.encode(), b'2') for key in "abc"])
+        self.db["d"] = 3
+        follower.poll()
+        assert dict(follower.items()) == {"a": 2, "b": 2, "c": 2, "d": 3}
+        follower.close()
+
+    def test_follower_copies_again_when_the_change_log_is_reset(self):
+        self.db["key"] = 1
+        self.db.backup(self.backup)
+        self.db.close()
+        os.remove(self.path + ".changes")
+
+        self.db = pysos.Dict(self.path, changelog=True)
+        self.db["key"] = 2
+        self.db["other"] = 3
+        follower = pysos.Follower(self.backup, self.path)
+        follower.poll()
+        assert dict(follower.items()) == {"key": 2, "other": 3}
+        follower.close()
+
+    def test_follower_can_be_vacuumed(self):
+        for i in range(10):
+            self.db[i] = i
+        follower = pysos.Follower(self.backup, self.path)
+        follower.poll()
+        for i in range(5):
+            self.db[i] = "updated"
+        follower.poll()
+        follower.vacuum()
+        self.db[0] = "after vacuum"
+        assert follower.poll() == 1
+        assert dict(follower.items()) == dict(self.db.items())
+        follower.close()
+
+    def test_changes_are_replayed_after_a_crash(self):
+        self.db["key"] = 1
+        self.db.close()
+        # as if the process died after logging a change but before writing it, and while logging another one
+        with open(self.path + ".changes", "ab") as file:
+            file.write(b'"key"\t2\n"lost"\t"value"\n"torn"\t"val')
+
+        self.db = pysos.Dict(self.path, changelog=True, blob_threshold=100)
+        assert dict(self.db.items()) == {"key": 2, "lost": "value"}
+        self.db["next"] = 3
+        follower = pysos.Follower(self.backup, self.path)
+        follower.poll()
+        assert dict(follower.items()) == {"key": 2, "lost": "value", "next": 3}
+        follower.close()
+
+    def test_change_log_is_rolled_over_once_followers_applied_it(self):
+        for i in range(100):
+            self.db["key %d" % i] = "x" * 100
+        follower = pysos.Follower(self.backup, self.path)
+        follower.poll()
+        self.db["key 0"] = "not applied yet"
+        self.db.vacuum()
+        with open(self.path + ".changes", "rb") as file:
+            lines = file.readlines()
+        assert lines[1:] == [b'"key 0"\t"not applied yet"\n', b'# checkpoint\n']
+
+        del self.db["key 1"]
+        assert follower.poll() == 2
+        assert dict(follower.items()) == dict(self.db.items())
+
+        self.db.backup(self.backup)
+        self.db.vacuum()
+        assert os.path.getsize(self.path + ".changes") < 100
+        self.db["key 2"] = "after roll over"
+        assert follower.poll() == 1
+        assert dict(follower.items()) == dict(self.db.items())
+        follower.close()
+
+        # followers which were not registered copy everything
+        os.remove(self.backup + ".follow")
+        follower = pysos.Follower(self.backup, self.path)
+        follower.poll()
+        assert dict(follower.items()) == dict(self.db.items())
+        follower.close()
+
+    def test_changes_are_logged_once_there_is_a_log(self):
+        self.db["a"] = 1
+        self.db.close()
+        self.db = pysos.Dict(self.path, blob_threshold=100)
+        self.db["b"] = 2
+        self.db.backup(self.backup)
+        copy = pysos.Dict(self.backup)
+        assert dict(copy.items()) == {"a": 1, "b": 2}
+        copy.close()
+
+    def test_backup_needs_the_change_log(self):
+        db = pysos.Dict("temp/no-changelog.sos")
+        with self.assertRaises(ValueError):
+            db.backup(self.backup)
+        db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
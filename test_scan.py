@@ -0,0 +1,82 @@
+import pysos
+import unittest
+import io
+import json
+
+
+def readlineIndex(file):
+    # the original line by line scan, as a reference
+    offsets = {}
+    free_lines = []
+    offset = 0
+    file.seek(0)
+    while True:
+        line = file.readline()
+        if line == b'':
+            break
+        if line == b'\n':
+            offset += len(line)
+            continue
+        if line.startswith(b'#'):
+            if len(line) > 5 and offset > 0:
+                free_lines.append((len(line), offset))
+        else:
+            offsets[pysos.parseKey(line)] = offset
+        offset += len(line)
+    return offsets, free_lines
+
+
+def chunkedIndex(file, **kwargs):
+    offsets = {}
+    free_lines = []
+    for (batch_offsets, batch_free_lines, position) in pysos.scanIndex(file, **kwargs):
+        offsets.update(batch_offsets)
+        free_lines.extend(batch_free_lines)
+    return offsets, free_lines
+
+
+KEYS = ["key", "", "with \"quotes\"", "tab\tin key", "unicode é中", "back\\slash",
+        0, 1, 10, -1, -10, 1.5, True, None]
+
+
+class TestScan(unittest.TestCase):
+    def data(self):
+        out = io.BytesIO()
+        out.write(pysos.Dict.START_FLAG)
+        for i, key in enumerate(KEYS):
+            out.write((json.dumps(key) + "\t" + json.dumps({"value": "x" * i}) + "\n").encode("utf8"))
+            out.write(b"\n")
+            out.write(b"#" + b"-" * i + b"\n")
+        out.write(b'"key"\t"duplicate, the last one wins"\n')
+        out.write(b'"01"\t1\n')
+        out.write(b' "spaced" \t1\n')
+        out.write(b'"no newline"\t"at the end"')
+        return out
+
+    def test_same_index_as_readline(self):
+        file = self.data()
+        expected = readlineIndex(file)
+        for chunk_size in (1, 7, 100, 1024 * 1024):
+            pysos.CHUNK_SIZE, old = chunk_size, pysos.CHUNK_SIZE
+            try:
+                assert chunkedIndex(file) == expected
+                assert chunkedIndex(file, batch=3) == expected
+            finally:
+                pysos.CHUNK_SIZE = old
+
+    def test_comment_without_newline_at_the_end(self):
+        for comment in (b"#abcd", b"#abcde", b"#abcdef"):
+            file = io.BytesIO(pysos.Dict.START_FLAG + b'-0\t"zero"\n' + comment)
+            assert chunkedIndex(file) == readlineIndex(file)
+
+    def test_scan_stops_at_end(self):
+        file = self.data()
+        offsets, free_lines = readlineIndex(file)
+        end = offsets[10]
+        offsets, free_lines = chunkedIndex(file, end=end)
+        assert 10 not in offsets
+        assert 1 in offsets
+
+
+if __name__ == "__main__":
+    unittest.main()